@@ -0,0 +1,580 @@
+"""Load-test harness for the slskd Discord bot.
+
+Runs the real ``SlskdCog`` against a local fake slskd HTTP server and a
+stubbed Discord layer, drives it with many concurrent simulated users and
+reports command latency, event-loop lag and memory growth.
+
+Usage:
+    python scripts/load_test.py --users 50 --iterations 3
+    python scripts/load_test.py --serve-only --port 5030   # just the fake slskd
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+API_PREFIX = "/api/v0"
+
+
+# --- Fake slskd ---
+class FakeSlskd:
+    """In-memory slskd stand-in serving the endpoints the bot uses.
+
+    Searches fill up over ``search_seconds`` so the bot's refresh path is
+    exercised, and enqueued files progress through queued, in-progress and
+    completed states at a per-peer speed.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 20.0,
+        responses: int = 50,
+        files_per_response: int = 20,
+        search_seconds: float = 3.0,
+        failure_rate: float = 0.05,
+        seed: int = 1,
+    ):
+        self.latency_ms = latency_ms
+        self.responses = responses
+        self.files_per_response = files_per_response
+        self.search_seconds = search_seconds
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.searches: Dict[str, Dict[str, Any]] = {}
+        # { username: [transfer, ...] }
+        self.transfers: Dict[str, List[Dict[str, Any]]] = {}
+        self.peer_speed: Dict[str, int] = {}
+        self.request_counts: Dict[str, int] = {}
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes(
+            [
+                web.post(f"{API_PREFIX}/searches", self.start_search),
+                web.get(f"{API_PREFIX}/searches/{{id}}", self.search_state),
+                web.get(f"{API_PREFIX}/searches/{{id}}/responses", self.search_responses),
+                web.post(f"{API_PREFIX}/transfers/downloads/{{username}}", self.enqueue),
+                web.get(f"{API_PREFIX}/transfers/downloads/", self.all_downloads),
+                web.delete(
+                    f"{API_PREFIX}/transfers/downloads/{{username}}/{{id}}", self.remove_download
+                ),
+                web.get(f"{API_PREFIX}/application", self.application),
+                web.get(f"{API_PREFIX}/application/version", self.version),
+            ]
+        )
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        route = request.match_info.route.resource
+        name = route.canonical if route is not None else request.path
+        self.request_counts[name] = self.request_counts.get(name, 0) + 1
+        if self.latency_ms:
+            await asyncio.sleep(self.random.expovariate(1000.0 / self.latency_ms))
+        return await handler(request)
+
+    # Searches
+    def _build_responses(self, query: str) -> List[Dict[str, Any]]:
+        rng = random.Random(query)
+        responses = []
+        for peer_index in range(self.responses):
+            username = f"peer{rng.randrange(self.responses * 4)}"
+            files = []
+            album = f"@@{username}\\Music\\{query.title()} {peer_index}\\Album {rng.randrange(20)}"
+            for track in range(self.files_per_response):
+                ext = rng.choice(("flac", "mp3", "ogg"))
+                files.append(
+                    {
+                        "filename": f"{album}\\{track + 1:02d} - {query} {track}.{ext}",
+                        "size": rng.randrange(2, 60) * 1024 * 1024,
+                        "bitRate": 0 if ext == "flac" else rng.choice((128, 192, 320)),
+                        "extension": "",
+                        "isLocked": False,
+                    }
+                )
+            responses.append(
+                {
+                    "username": username,
+                    "token": rng.randrange(1, 2**31),
+                    "hasFreeUploadSlot": rng.random() < 0.6,
+                    "uploadSpeed": rng.randrange(50, 5000) * 1024,
+                    "queueLength": rng.randrange(0, 20),
+                    "fileCount": len(files),
+                    "files": files,
+                }
+            )
+        return responses
+
+    async def start_search(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        search_id = body.get("id") or str(uuid.uuid1())
+        self.searches[search_id] = {
+            "id": search_id,
+            "searchText": body.get("searchText", ""),
+            "started": time.monotonic(),
+            "responses": self._build_responses(body.get("searchText", "")),
+        }
+        return web.json_response({"id": search_id, "state": "InProgress"})
+
+    def _visible_responses(self, search: Dict[str, Any]) -> List[Dict[str, Any]]:
+        elapsed = time.monotonic() - search["started"]
+        fraction = min(1.0, elapsed / self.search_seconds) if self.search_seconds else 1.0
+        return search["responses"][: int(len(search["responses"]) * fraction)]
+
+    async def search_state(self, request: web.Request) -> web.Response:
+        search = self.searches.get(request.match_info["id"])
+        if search is None:
+            raise web.HTTPNotFound()
+        elapsed = time.monotonic() - search["started"]
+        visible = self._visible_responses(search)
+        return web.json_response(
+            {
+                "id": search["id"],
+                "searchText": search["searchText"],
+                "isComplete": elapsed >= self.search_seconds,
+                "responseCount": len(visible),
+                "fileCount": sum(len(r["files"]) for r in visible),
+            }
+        )
+
+    async def search_responses(self, request: web.Request) -> web.Response:
+        search = self.searches.get(request.match_info["id"])
+        if search is None:
+            raise web.HTTPNotFound()
+        return web.json_response(self._visible_responses(search))
+
+    # Transfers
+    async def enqueue(self, request: web.Request) -> web.Response:
+        username = request.match_info["username"]
+        files = await request.json()
+        speed = self.peer_speed.setdefault(
+            username, self.random.randrange(100, 5000) * 1024
+        )
+        now = time.monotonic()
+        stamp = datetime.now(timezone.utc).isoformat()
+        for file_info in files:
+            self.transfers.setdefault(username, []).append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "filename": file_info.get("filename"),
+                    "size": file_info.get("size", 0) or 0,
+                    "queued_for": self.random.uniform(0.0, 5.0),
+                    "speed": speed,
+                    "fails": self.random.random() < self.failure_rate,
+                    "enqueued": now,
+                    "enqueued_wall": time.time(),
+                    "requestedAt": stamp,
+                    "removed": False,
+                }
+            )
+        return web.json_response(status=201)
+
+    def _transfer_view(self, username: str, transfer: Dict[str, Any], now: float):
+        elapsed = now - transfer["enqueued"] - transfer["queued_for"]
+        size = transfer["size"]
+        if elapsed <= 0:
+            state, transferred = "Queued, Remotely", 0
+        else:
+            transferred = min(size, int(elapsed * transfer["speed"]))
+            if transfer["fails"] and transferred >= size // 2:
+                state, transferred = "Completed, Errored", size // 2
+            elif transferred >= size:
+                state = "Completed, Succeeded"
+            else:
+                state = "InProgress"
+        return {
+            "id": transfer["id"],
+            "username": username,
+            "direction": "Download",
+            "filename": transfer["filename"],
+            "size": size,
+            "state": state,
+            "bytesTransferred": transferred,
+            "bytesRemaining": size - transferred,
+            "percentComplete": (100.0 * transferred / size) if size else 100.0,
+            "averageSpeed": float(transfer["speed"]) if transferred else 0.0,
+            "requestedAt": transfer["requestedAt"],
+            "enqueuedAt": transfer["requestedAt"],
+            "startedAt": (
+                datetime.fromtimestamp(
+                    transfer["enqueued_wall"] + transfer["queued_for"], timezone.utc
+                ).isoformat()
+                if elapsed > 0
+                else None
+            ),
+        }
+
+    async def all_downloads(self, request: web.Request) -> web.Response:
+        now = time.monotonic()
+        include_removed = request.query.get("includeRemoved", "false").lower() == "true"
+        payload = []
+        for username, transfers in self.transfers.items():
+            directories: Dict[str, List[Dict[str, Any]]] = {}
+            for transfer in transfers:
+                if transfer["removed"] and not include_removed:
+                    continue
+                directory = (transfer["filename"] or "").rsplit("\\", 1)[0]
+                directories.setdefault(directory, []).append(
+                    self._transfer_view(username, transfer, now)
+                )
+            payload.append(
+                {
+                    "username": username,
+                    "directories": [
+                        {"directory": d, "fileCount": len(f), "files": f}
+                        for d, f in directories.items()
+                    ],
+                }
+            )
+        return web.json_response(payload)
+
+    async def remove_download(self, request: web.Request) -> web.Response:
+        transfer_id = request.match_info["id"]
+        for transfer in self.transfers.get(request.match_info["username"], []):
+            if transfer["id"] == transfer_id:
+                if request.query.get("remove", "false").lower() == "true":
+                    transfer["removed"] = True
+                return web.Response(status=204)
+        raise web.HTTPNotFound()
+
+    async def application(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"server": {"isConnected": True, "isLoggedIn": True, "username": "loadtest"}}
+        )
+
+    async def version(self, request: web.Request) -> web.Response:
+        return web.json_response("0.0.0-loadtest")
+
+
+def start_fake_slskd(fake: FakeSlskd, port: int = 0) -> int:
+    """Serves ``fake`` from a background thread with its own event loop.
+
+    Keeping the server off the bot's loop stops it from polluting the lag
+    measurements. Returns the bound port.
+    """
+    ready = threading.Event()
+    bound: Dict[str, int] = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(fake.app(), access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", port)
+        loop.run_until_complete(site.start())
+        bound["port"] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="fake-slskd", daemon=True).start()
+    ready.wait()
+    return bound["port"]
+
+
+# --- Fake Discord ---
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"loaduser{user_id}"
+        self.mention = f"<@{user_id}>"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", content: Optional[str] = None, **kwargs):
+        self.channel = channel
+        self.content = content
+        self.embed = kwargs.get("embed")
+        self.view = kwargs.get("view")
+        self.edits = 0
+
+    async def edit(self, content: Optional[str] = None, **kwargs) -> "FakeMessage":
+        self.edits += 1
+        self.content = content
+        if "embed" in kwargs:
+            self.embed = kwargs["embed"]
+        if "view" in kwargs:
+            self.view = kwargs["view"]
+        return self
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.sent: List[FakeMessage] = []
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        message = FakeMessage(self, content, **kwargs)
+        self.sent.append(message)
+        return message
+
+    def __str__(self) -> str:
+        return f"#loadtest-{self.id}"
+
+
+class FakeContext:
+    """Prefix-command context stand-in; no interaction, so no deferral."""
+
+    def __init__(self, author: FakeUser, channel: FakeChannel):
+        self.author = author
+        self.channel = channel
+        self.interaction = None
+
+    async def defer(self, **kwargs):
+        return None
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        kwargs.pop("ephemeral", None)
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        return await self.send(content, **kwargs)
+
+
+class FakeBot:
+    def __init__(self):
+        self.users: Dict[int, FakeUser] = {}
+        self.channels: Dict[int, FakeChannel] = {}
+
+    async def wait_until_ready(self):
+        return None
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self.channels.get(channel_id)
+
+    async def fetch_user(self, user_id: int) -> FakeUser:
+        return self.users.setdefault(user_id, FakeUser(user_id))
+
+    async def fetch_channel(self, channel_id: int) -> FakeChannel:
+        return self.channels.setdefault(channel_id, FakeChannel(channel_id))
+
+    def get_cog(self, name: str):
+        return None
+
+
+# --- Scenario Runner ---
+class LoopLagProbe:
+    """Samples event-loop lag as the overshoot of a short periodic sleep."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def invoke(cog, command_name: str, ctx, **kwargs):
+    """Runs a cog command's callback directly, as discord.py would after parsing."""
+    command = getattr(cog, command_name)
+    return command.callback(cog, ctx, **kwargs)
+
+
+QUERIES = ["aphex twin", "boards of canada", "autechre", "burial", "four tet", "jon hopkins"]
+
+
+async def simulate_user(cog, bot: FakeBot, user_id: int, args, latencies: Dict[str, List[float]]):
+    rng = random.Random(user_id)
+    user = await bot.fetch_user(user_id)
+    channel = await bot.fetch_channel(1000 + user_id % args.channels)
+    ctx = FakeContext(user, channel)
+
+    async def timed(name: str, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            latencies.setdefault("errors", []).append(0.0)
+            print(f"[user {user_id}] {name} raised {e!r}", file=sys.stderr)
+        latencies.setdefault(name, []).append(time.perf_counter() - started)
+
+    await asyncio.sleep(rng.uniform(0, args.ramp_seconds))
+    for _ in range(args.iterations):
+        await timed("search", invoke(cog, "search", ctx, query=rng.choice(QUERIES)))
+        await timed("filter", invoke(cog, "filter_results", ctx, criteria="ext:flac free"))
+        await timed("filter clear", invoke(cog, "filter_results", ctx, criteria=""))
+        await timed("dl", invoke(cog, "download", ctx, selection=str(rng.randint(1, 20))))
+        await timed("progress", invoke(cog, "progress", ctx))
+        await asyncio.sleep(rng.uniform(0, args.think_seconds))
+
+
+async def run_scenario(args) -> Dict[str, Any]:
+    import slskd_discord_bot as botmod
+
+    fake_bot = FakeBot()
+    cog = botmod.SlskdCog(fake_bot)
+    cog.download_monitor.change_interval(seconds=args.monitor_seconds)
+
+    latencies: Dict[str, List[float]] = {}
+    probe = LoopLagProbe()
+    tracemalloc.start()
+    mem_before, _ = tracemalloc.get_traced_memory()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    probe.start()
+    started = time.perf_counter()
+
+    await asyncio.gather(
+        *(simulate_user(cog, fake_bot, uid, args, latencies) for uid in range(1, args.users + 1))
+    )
+    # Let the monitor observe the tail of the downloads
+    await asyncio.sleep(args.drain_seconds)
+
+    elapsed = time.perf_counter() - started
+    probe.stop()
+    mem_after, mem_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cog.download_monitor.cancel()
+    cog.wishlist_scheduler.cancel()
+    await cog.api.close()
+
+    notifications = sum(
+        1
+        for channel in fake_bot.channels.values()
+        for message in channel.sent
+        if message.content and "download is complete" in message.content
+    )
+    return {
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "lag": probe.samples,
+        "mem_growth": mem_after - mem_before,
+        "mem_peak": mem_peak,
+        "rss_growth_kb": rss_after - rss_before,
+        "notifications": notifications,
+    }
+
+
+def print_report(report: Dict[str, Any], fakes: List[FakeSlskd]):
+    print(f"\nElapsed: {report['elapsed']:.1f}s")
+    print(f"{'command':<14}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, samples in sorted(report["latencies"].items()):
+        if name == "errors":
+            continue
+        print(
+            f"{name:<14}{len(samples):>7}"
+            f"{percentile(samples, 50) * 1000:>10.1f}"
+            f"{percentile(samples, 99) * 1000:>10.1f}"
+            f"{max(samples) * 1000:>10.1f}"
+        )
+    errors = len(report["latencies"].get("errors", []))
+    lag = report["lag"]
+    print(
+        f"\nEvent-loop lag: p50 {percentile(lag, 50) * 1000:.1f} ms, "
+        f"p99 {percentile(lag, 99) * 1000:.1f} ms, "
+        f"max {max(lag, default=0.0) * 1000:.1f} ms over {len(lag)} samples"
+    )
+    print(
+        f"Memory: +{report['mem_growth'] / 1024:.0f} KiB traced "
+        f"(peak {report['mem_peak'] / 1024:.0f} KiB), "
+        f"+{report['rss_growth_kb']} KiB max RSS"
+    )
+    print(f"Command errors: {errors}; completion notices sent: {report['notifications']}")
+    for index, fake in enumerate(fakes):
+        print(f"Fake slskd {index} requests: " + json.dumps(fake.request_counts, sort_keys=True))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, default=50, help="Concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=2, help="Search/dl rounds per user")
+    parser.add_argument("--channels", type=int, default=5, help="Channels the users share")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean fake slskd latency")
+    parser.add_argument("--responses", type=int, default=50, help="Peers per search")
+    parser.add_argument("--files-per-response", type=int, default=20)
+    parser.add_argument("--search-seconds", type=float, default=3.0)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--ramp-seconds", type=float, default=5.0)
+    parser.add_argument("--think-seconds", type=float, default=2.0)
+    parser.add_argument("--monitor-seconds", type=float, default=5.0)
+    parser.add_argument("--drain-seconds", type=float, default=10.0)
+    parser.add_argument("--backends", type=int, default=1, help="Fake slskd instances to pool")
+    parser.add_argument("--port", type=int, default=0, help="Fake slskd port (0 = any)")
+    parser.add_argument("--serve-only", action="store_true", help="Only run the fake slskd")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fakes = [
+        FakeSlskd(
+            latency_ms=args.latency_ms,
+            responses=args.responses,
+            files_per_response=args.files_per_response,
+            search_seconds=args.search_seconds,
+            failure_rate=args.failure_rate,
+            seed=index + 1,
+        )
+        for index in range(max(args.backends, 1))
+    ]
+    ports = [
+        start_fake_slskd(fake, args.port + index if args.port else 0)
+        for index, fake in enumerate(fakes)
+    ]
+    for port in ports:
+        print(f"Fake slskd listening on http://127.0.0.1:{port}")
+    if args.serve_only:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return
+        return
+
+    # The bot reads its configuration at import time
+    os.environ["SLSKD_API_URL"] = f"http://127.0.0.1:{ports[0]}"
+    os.environ.setdefault("SLSKD_API_KEY", "loadtest")
+    if len(ports) > 1:
+        names = [f"fake{index}" for index in range(len(ports))]
+        os.environ["SLSKD_BACKENDS"] = ",".join(names)
+        for name, port in zip(names, ports):
+            os.environ[f"SLSKD_{name.upper()}_API_URL"] = f"http://127.0.0.1:{port}"
+            os.environ[f"SLSKD_{name.upper()}_API_KEY"] = "loadtest"
+    else:
+        os.environ.pop("SLSKD_BACKENDS", None)
+    os.environ.setdefault("DISCORD_BOT_TOKEN", "loadtest")
+    # Keep peer statistics from a run out of the working directory
+    os.environ.setdefault("BOT_DATA_DIR", tempfile.mkdtemp(prefix="slskbot-load-"))
+    os.environ.pop("NAVIDROME_ADMIN_USER", None)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    report = asyncio.run(run_scenario(args))
+    print_report(report, fakes)
+
+
+if __name__ == "__main__":
+    main()
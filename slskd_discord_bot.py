@@ -1,11 +1,25 @@
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from discord.ui import View, Button, button
 import aiohttp
 import asyncio
+import bisect
+import hashlib
+import inspect
+from datetime import datetime, timezone
 import os
+import random
+import threading
+import time
+import traceback
+import uuid
+from array import array
+import sys
+from collections import OrderedDict, deque
+import json
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 import typing as _typing
 
@@ -17,6 +31,16 @@ if not hasattr(_typing, "NotRequired"):
 import requests
 from slskd_api import SlskdClient
 
+# Optional faster JSON decoders for the (large) transfer list
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 # --- Configuration ---
 # Set these environment variables before running the bot
 DISCORD_BOT_TOKEN = os.environ.get("DISCORD_BOT_TOKEN")
@@ -24,6 +48,95 @@ SLSKD_API_URL = os.environ.get(
     "SLSKD_API_URL", "http://localhost:5030"
 )  # e.g., "http://your-slskd-ip:5030"
 SLSKD_API_KEY = os.environ.get("SLSKD_API_KEY")
+# Optional pool of slskd instances, e.g. SLSKD_BACKENDS=home,vps. Each name
+# reads SLSKD_<NAME>_API_URL and SLSKD_<NAME>_API_KEY. Unset means one
+# backend built from SLSKD_API_URL / SLSKD_API_KEY.
+SLSKD_BACKENDS = [
+    name.strip()
+    for name in os.environ.get("SLSKD_BACKENDS", "").split(",")
+    if name.strip()
+]
+
+# Slash command registration. Prefix commands need the privileged message
+# content intent; set DISCORD_PREFIX_COMMANDS=false to run slash-only.
+DISCORD_PREFIX_COMMANDS = os.environ.get(
+    "DISCORD_PREFIX_COMMANDS", "true"
+).lower() not in ("0", "false", "no")
+DISCORD_GUILD_ID = os.environ.get("DISCORD_GUILD_ID")  # Optional: instant guild sync
+
+# --- Download Queue Limits ---
+# Transfers slskd is actively running at once: overall, per remote peer, per Discord user
+MAX_ACTIVE_DOWNLOADS = int(os.environ.get("MAX_ACTIVE_DOWNLOADS", "20"))
+MAX_DOWNLOADS_PER_PEER = int(os.environ.get("MAX_DOWNLOADS_PER_PEER", "4"))
+MAX_DOWNLOADS_PER_USER = int(os.environ.get("MAX_DOWNLOADS_PER_USER", "10"))
+
+# --- slskd Resilience ---
+# Per-endpoint socket timeouts (seconds) and retry budgets. Only idempotent
+# reads are retried; searches and enqueues are attempted once.
+SLSKD_ENDPOINT_POLICIES: Dict[str, Dict[str, Any]] = {
+    "start_search": {"timeout": 15, "retries": 0},
+    "get_search_state": {"timeout": 10, "retries": 2},
+    "get_search_results": {"timeout": 30, "retries": 2},
+    "get_all_downloads": {"timeout": 30, "retries": 2},
+    "get_application_state": {"timeout": 10, "retries": 2},
+    # These wait on the remote peer. A slow or offline peer isn't retried and
+    # doesn't count against slskd's health ("peer"); browsing gets much longer.
+    "enqueue_files": {"timeout": 30, "retries": 0, "peer": True},
+    "browse_user": {"timeout": 120, "retries": 0, "peer": True},
+    "get_directory": {"timeout": 45, "retries": 0, "peer": True},
+    "remove_download": {"timeout": 15, "retries": 1},
+}
+SLSKD_DEFAULT_POLICY = {"timeout": 15, "retries": 0}
+RETRY_BASE_DELAY = 0.5  # Seconds; doubled per attempt, full jitter
+RETRY_MAX_DELAY = 5.0
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive transport failures before opening
+BREAKER_RESET_SECONDS = 30.0  # How long to fail fast before probing again
+SLSKD_DEGRADED_MESSAGE = (
+    "⚠️ slskd is not responding right now. I'll keep retrying in the background; "
+    "please try again in a minute."
+)
+
+# --- Search Result Processing ---
+# Searches with at least this many files are flattened and sorted on a worker
+# thread so the event loop keeps serving heartbeats and other commands
+RESULT_OFFLOAD_FILES = int(os.environ.get("RESULT_OFFLOAD_FILES", "2000"))
+
+# --- Peer Browse Cache ---
+BROWSE_CACHE_TTL = float(os.environ.get("BROWSE_CACHE_TTL", "900"))  # Seconds
+BROWSE_CACHE_PEERS = int(os.environ.get("BROWSE_CACHE_PEERS", "32"))
+
+# --- Transfer Retention ---
+# Finished downloads are removed from slskd so its transfer list stays small.
+# When pruning is on, the bot also stops asking slskd for removed transfers.
+TRANSFER_PRUNING = os.environ.get("TRANSFER_PRUNING", "true").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+TRANSFER_RETENTION_SECONDS = float(os.environ.get("TRANSFER_RETENTION_SECONDS", "600"))
+UNTRACKED_TRANSFER_RETENTION_SECONDS = float(
+    os.environ.get("UNTRACKED_TRANSFER_RETENTION_SECONDS", "86400")
+)
+TRANSFER_PRUNE_BATCH = int(os.environ.get("TRANSFER_PRUNE_BATCH", "50"))
+
+# --- Peer Reputation ---
+# Per-peer download history, kept across restarts in BOT_DATA_DIR
+BOT_DATA_DIR = os.environ.get("BOT_DATA_DIR", ".")
+PEER_STATS_HALF_LIFE_DAYS = float(os.environ.get("PEER_STATS_HALF_LIFE_DAYS", "14"))
+PEER_STATS_MAX_PEERS = int(os.environ.get("PEER_STATS_MAX_PEERS", "5000"))
+
+# --- Wishlist ---
+# `!wish` queries are re-searched in the background: every WISHLIST_INTERVAL_SECONDS
+# at most WISHLIST_BATCH due wishes are searched, one after another, and each wish
+# waits WISHLIST_RECHECK_SECONDS before it is searched again.
+WISHLIST_INTERVAL_SECONDS = float(os.environ.get("WISHLIST_INTERVAL_SECONDS", "300"))
+WISHLIST_BATCH = int(os.environ.get("WISHLIST_BATCH", "3"))
+WISHLIST_RECHECK_SECONDS = float(os.environ.get("WISHLIST_RECHECK_SECONDS", "21600"))
+WISHES_PER_USER = int(os.environ.get("WISHES_PER_USER", "10"))
+
+# --- Diagnostics ---
+# Loop lag above this is logged along with the stack of whatever blocked it
+LOOP_LAG_THRESHOLD_MS = float(os.environ.get("LOOP_LAG_THRESHOLD_MS", "250"))
 
 # --- New Navidrome Configuration ---
 NAVIDROME_URL = "http://navidrome:4533"  # Internal Docker service name
@@ -34,14 +147,35 @@ NAVIDROME_ADMIN_PASSWORD = os.environ.get("NAVIDROME_ADMIN_PASSWORD")
 if not DISCORD_BOT_TOKEN:
     print("Error: DISCORD_BOT_TOKEN environment variable not set.")
     exit(1)
-if not SLSKD_API_KEY:
-    print("Error: SLSKD_API_KEY environment variable not set.")
-    exit(1)
+
+# (name, url, api_key) for every configured slskd instance
+SLSKD_BACKEND_CONFIGS: List[Tuple[str, str, Optional[str]]] = [
+    (
+        name,
+        os.environ.get(f"SLSKD_{name.upper()}_API_URL", ""),
+        os.environ.get(f"SLSKD_{name.upper()}_API_KEY"),
+    )
+    for name in SLSKD_BACKENDS
+] or [("default", SLSKD_API_URL, SLSKD_API_KEY)]
+for _name, _url, _key in SLSKD_BACKEND_CONFIGS:
+    if not _url or not _key:
+        if SLSKD_BACKENDS:
+            print(
+                f"Error: SLSKD_{_name.upper()}_API_URL / SLSKD_{_name.upper()}_API_KEY "
+                "environment variables not set."
+            )
+        else:
+            print("Error: SLSKD_API_KEY environment variable not set.")
+        exit(1)
 
 # --- Bot Setup ---
 intents = discord.Intents.default()
-intents.message_content = True  # Required for message-based commands
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+intents.message_content = DISCORD_PREFIX_COMMANDS  # Required for message-based commands
+bot = commands.Bot(
+    command_prefix="!" if DISCORD_PREFIX_COMMANDS else commands.when_mentioned,
+    intents=intents,
+    help_command=None,
+)
 
 # --- Logging ---
 logging.basicConfig(
@@ -50,6 +184,210 @@ logging.basicConfig(
 logger = logging.getLogger("slskd-bot")
 
 
+# --- Transfer Decoding ---
+# The only per-file fields the bot reads from GET /transfers/downloads
+TRANSFER_FIELDS = (
+    "id",
+    "username",
+    "filename",
+    "state",
+    "bytesRemaining",
+    "percentComplete",
+    "averageSpeed",
+    "requestedAt",
+    "enqueuedAt",
+    "startedAt",
+)
+
+if msgspec is not None:
+
+    class _TransferFile(msgspec.Struct):
+        """Typed projection of a slskd transfer; unknown fields are skipped."""
+
+        id: Optional[str] = None
+        username: Optional[str] = None
+        direction: Optional[str] = None
+        filename: Optional[str] = None
+        state: Optional[str] = None
+        bytesRemaining: Optional[int] = None
+        percentComplete: Optional[float] = None
+        averageSpeed: Optional[float] = None
+        requestedAt: Optional[str] = None
+        enqueuedAt: Optional[str] = None
+        startedAt: Optional[str] = None
+
+    class _TransferDirectory(msgspec.Struct):
+        files: List[_TransferFile] = []
+
+    class _TransferGroup(msgspec.Struct):
+        username: Optional[str] = None
+        directories: List[_TransferDirectory] = []
+
+    _transfer_decoder = msgspec.json.Decoder(List[_TransferGroup])
+else:
+    _transfer_decoder = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Raised when a transfers payload can't be decoded or isn't shaped as expected.
+# orjson's and the stdlib's decode errors are ValueErrors.
+TRANSFER_DECODE_ERRORS: Tuple[type, ...] = (ValueError, TypeError, AttributeError) + (
+    (msgspec.MsgspecError,) if msgspec is not None else ()
+)
+
+
+_NUMERIC_TRANSFER_FIELDS = ("bytesRemaining", "percentComplete", "averageSpeed")
+
+
+def _as_number(value: Any) -> Optional[float]:
+    """Numeric transfer fields from an untyped payload; None if unusable."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_download_records(raw: bytes) -> Iterator[Dict[str, Any]]:
+    """Yields one flat record per download in a transfers payload.
+
+    Only ``TRANSFER_FIELDS`` are kept. With msgspec installed, the other
+    fields are never materialized at all; otherwise the payload is decoded
+    with orjson (or the stdlib) and projected file by file. A payload that
+    doesn't match the typed schema (say, one field changed type) falls back
+    to the lenient untyped projection rather than failing the whole poll.
+    """
+    groups = None
+    if _transfer_decoder is not None:
+        try:
+            groups = _transfer_decoder.decode(raw)
+        except msgspec.ValidationError as e:
+            logger.warning(
+                f"Transfer list doesn't match the expected schema ({e}); decoding untyped"
+            )
+    if groups is not None:
+        for group in groups:
+            for directory in group.directories:
+                for f in directory.files:
+                    if f.direction != "Download":
+                        continue
+                    yield {
+                        "id": f.id,
+                        "username": f.username or group.username,
+                        "filename": f.filename,
+                        "state": f.state,
+                        "bytesRemaining": f.bytesRemaining,
+                        "percentComplete": f.percentComplete,
+                        "averageSpeed": f.averageSpeed,
+                        "requestedAt": f.requestedAt,
+                        "enqueuedAt": f.enqueuedAt,
+                        "startedAt": f.startedAt,
+                    }
+        return
+
+    for group in _json_loads(raw):
+        username = group.get("username")
+        for directory in group.get("directories", []):
+            for f in directory.get("files", []):
+                if f.get("direction") != "Download":
+                    continue
+                record = {field: f.get(field) for field in TRANSFER_FIELDS}
+                record["username"] = record["username"] or username
+                for field in _NUMERIC_TRANSFER_FIELDS:
+                    record[field] = _as_number(record[field])
+                yield record
+
+
+# Timeout for the slskd request running on the current worker thread
+_request_timeout = threading.local()
+
+
+class _EndpointTimeoutAdapter(requests.adapters.HTTPAdapter):
+    """Applies the calling endpoint's timeout to every request on the session.
+
+    slskd-api's own adapter pins one timeout for the whole client, so the
+    per-endpoint value is handed over through a thread-local instead.
+    """
+
+    def send(self, request, **kwargs):
+        kwargs["timeout"] = getattr(_request_timeout, "value", None) or SLSKD_DEFAULT_POLICY[
+            "timeout"
+        ]
+        return super().send(request, **kwargs)
+
+
+def _is_transient(exc: requests.exceptions.RequestException) -> bool:
+    """Connection problems, timeouts and 5xx mean slskd itself is unhealthy."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return True
+    return response.status_code >= 500
+
+
+class SlskdUnreachable(Exception):
+    """slskd itself could not be reached, as opposed to a peer not answering."""
+
+
+class CircuitBreaker:
+    """Fails slskd calls fast after repeated transport failures.
+
+    Opens after ``failure_threshold`` consecutive failures, rejects calls for
+    ``reset_timeout`` seconds, then lets a single probe through; the probe's
+    outcome closes or re-opens the breaker.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected without trying slskd."""
+        if self.opened_at is None:
+            return False
+        return self._probing or time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.is_open:
+            return False
+        self._probing = True
+        return True
+
+    def release_probe(self):
+        """Ends a probe that produced no verdict, so the next call can probe again."""
+        self._probing = False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("slskd is responding again; closing circuit breaker.")
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"slskd failed {self.failures} times in a row; "
+                    f"failing fast for {self.reset_timeout:.0f}s."
+                )
+            self.opened_at = time.monotonic()
+
+
 class AsyncSlskdClient:
     """Async wrapper around the slskd-api synchronous client."""
 
@@ -58,12 +396,21 @@ class AsyncSlskdClient:
         self._client = SlskdClient(host=host, api_key=api_key, url_base="")
         # All API facades share the same requests.Session
         self._session = self._client.application.session
+        adapter = _EndpointTimeoutAdapter()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self.breaker = CircuitBreaker()
+
+    @property
+    def unavailable(self) -> bool:
+        """True while the circuit breaker is failing calls fast."""
+        return self.breaker.is_open
 
     async def close(self):
         await asyncio.to_thread(self._session.close)
 
     async def start_search(self, query: str) -> Optional[str]:
-        state = await self._call(self._client.searches.search_text, query)
+        state = await self._call("start_search", self._client.searches.search_text, query)
         if state and state.get("id"):
             logger.info(f"Started search for '{query}', ID: {state['id']}")
             return state["id"]
@@ -71,31 +418,310 @@ class AsyncSlskdClient:
         return None
 
     async def get_search_state(self, search_id: str) -> Optional[Dict[str, Any]]:
-        return await self._call(self._client.searches.state, search_id)
+        return await self._call("get_search_state", self._client.searches.state, search_id)
 
     async def get_search_results(self, search_id: str) -> Optional[List[Dict[str, Any]]]:
-        return await self._call(self._client.searches.search_responses, search_id)
+        return await self._call(
+            "get_search_results", self._client.searches.search_responses, search_id
+        )
 
     async def enqueue_files(
-        self, username: str, files: List[Dict[str, Any]]
+        self, username: str, files: List[Dict[str, Any]], raise_unreachable: bool = False
     ) -> Optional[bool]:
+        """Asks slskd to download ``files`` from ``username``.
+
+        With ``raise_unreachable``, failing to reach slskd raises SlskdUnreachable
+        instead of returning None, so a pool can tell it apart from a peer failure.
+        """
         if not files:
             return False
-        return await self._call(self._client.transfers.enqueue, username, files)
+        call = self._call_or_raise if raise_unreachable else self._call
+        return await call("enqueue_files", self._client.transfers.enqueue, username, files)
+
+    async def get_all_downloads(
+        self, include_removed: bool = True
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Returns one flat record per download file (see ``TRANSFER_FIELDS``)."""
+        return await self._call(
+            "get_all_downloads", self._fetch_download_records, include_removed
+        )
 
-    async def get_all_downloads(self) -> Optional[List[Dict[str, Any]]]:
+    def _fetch_download_records(self, include_removed: bool) -> Optional[List[Dict[str, Any]]]:
+        # Fetched directly so the body is decoded and projected on the worker
+        # thread, rather than turned into nested dicts by response.json().
         # includeRemoved=True ensures recently completed downloads are still returned
-        return await self._call(self._client.transfers.get_all_downloads, True)
+        url = self._client.transfers.api_url + "/transfers/downloads/"
+        response = self._session.get(url, params={"includeRemoved": include_removed})
+        try:
+            return list(iter_download_records(response.content))
+        except TRANSFER_DECODE_ERRORS as e:
+            # slskd answered, so this isn't a transport failure; skip this poll
+            logger.error(f"Could not decode slskd transfer list: {e}")
+            return None
+
+    async def remove_download(self, username: str, transfer_id: str) -> bool:
+        """Removes a finished download from slskd's transfer list."""
+        result = await self._call(
+            "remove_download",
+            self._client.transfers.cancel_download,
+            username,
+            transfer_id,
+            True,
+        )
+        return bool(result)
+
+    async def browse_user(self, username: str) -> Optional[Dict[str, Any]]:
+        return await self._call("browse_user", self._client.users.browse, username)
+
+    async def get_directory(
+        self, username: str, directory: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        return await self._call(
+            "get_directory", self._client.users.directory, username, directory
+        )
 
     async def get_application_state(self) -> Optional[Dict[str, Any]]:
-        return await self._call(self._client.application.state)
+        return await self._call("get_application_state", self._client.application.state)
 
-    async def _call(self, func, *args, **kwargs):
+    @staticmethod
+    def _run_with_timeout(timeout: float, func, *args, **kwargs):
+        _request_timeout.value = timeout
         try:
-            return await asyncio.to_thread(func, *args, **kwargs)
-        except requests.exceptions.RequestException as exc:
-            logger.error(f"slskd API request failed: {exc}")
+            return func(*args, **kwargs)
+        finally:
+            _request_timeout.value = None
+
+    async def _call(self, endpoint: str, func, *args, **kwargs):
+        try:
+            return await self._call_or_raise(endpoint, func, *args, **kwargs)
+        except SlskdUnreachable:
+            return None
+
+    async def _call_or_raise(self, endpoint: str, func, *args, **kwargs):
+        """Like _call, but raises SlskdUnreachable when slskd can't be reached."""
+        policy = SLSKD_ENDPOINT_POLICIES.get(endpoint, SLSKD_DEFAULT_POLICY)
+        attempts = 1 + policy["retries"]
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                logger.warning(f"slskd circuit open; skipping {endpoint}")
+                raise SlskdUnreachable(endpoint)
+            try:
+                result = await asyncio.to_thread(
+                    self._run_with_timeout, policy["timeout"], func, *args, **kwargs
+                )
+            except requests.exceptions.RequestException as exc:
+                if not _is_transient(exc):
+                    # slskd answered, so it is healthy; the request was just bad
+                    self.breaker.record_success()
+                    logger.error(f"slskd API request failed: {exc}")
+                    return None
+                if policy.get("peer") and not isinstance(
+                    exc, requests.exceptions.ConnectionError
+                ):
+                    # A timeout or 5xx here means the remote peer didn't answer;
+                    # only failing to reach slskd at all says slskd is down
+                    self.breaker.release_probe()
+                    logger.error(f"slskd {endpoint} failed waiting on the peer: {exc}")
+                    return None
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    logger.error(f"slskd API request failed: {exc}")
+                    raise SlskdUnreachable(endpoint) from exc
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+                logger.warning(
+                    f"slskd {endpoint} failed ({exc}); retry {attempt + 1}/{attempts - 1} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancellation or a bug says nothing about slskd's health; without
+                # this a failed probe would leave the breaker open for good
+                self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+        return None
+
+
+class SlskdBackendPool:
+    """Spreads work over several slskd instances behind the AsyncSlskdClient API.
+
+    Searches fan out to every reachable backend and their responses are merged,
+    each tagged with the backend(s) that found it. Enqueues go to the backend
+    with the fewest unfinished downloads, and transfer lists are merged so the
+    monitor sees one queue.
+    """
+
+    SEARCH_HISTORY = 256  # Pool search ids remembered for state/result lookups
+
+    def __init__(self, backends: List[Tuple[str, str, str]]):
+        self.clients: Dict[str, AsyncSlskdClient] = {
+            name: AsyncSlskdClient(url, key) for name, url, key in backends
+        }
+        # { pool_search_id: { backend_name: backend_search_id } }
+        self._searches: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        # Unfinished downloads per backend: last poll plus enqueues since
+        self.load: Dict[str, int] = {name: 0 for name in self.clients}
+        # Last good transfer list per backend, reused while one is unreachable
+        self._records: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self.clients}
+        self._transfer_backend: Dict[str, str] = {}  # transfer id -> backend name
+
+    @property
+    def unavailable(self) -> bool:
+        """True only when every backend is failing fast."""
+        return all(client.unavailable for client in self.clients.values())
+
+    def _reachable(self) -> List[Tuple[str, AsyncSlskdClient]]:
+        return [(name, client) for name, client in self.clients.items() if not client.unavailable]
+
+    async def close(self):
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
+
+    async def start_search(self, query: str) -> Optional[str]:
+        reachable = self._reachable()
+        ids = await asyncio.gather(*(client.start_search(query) for _, client in reachable))
+        started = {name: search_id for (name, _), search_id in zip(reachable, ids) if search_id}
+        if not started:
+            return None
+        pool_id = str(uuid.uuid4())
+        self._searches[pool_id] = started
+        while len(self._searches) > self.SEARCH_HISTORY:
+            self._searches.popitem(last=False)
+        return pool_id
+
+    async def get_search_state(self, search_id: str) -> Optional[Dict[str, Any]]:
+        started = self._searches.get(search_id)
+        if not started:
+            return None
+        states = await asyncio.gather(
+            *(self.clients[name].get_search_state(sid) for name, sid in started.items())
+        )
+        answered = [state for state in states if state]
+        if not answered:
+            return None
+        # A backend that stopped answering is treated as done, so it can't
+        # hold the whole search open
+        return {
+            "isComplete": all(state.get("isComplete") for state in answered),
+            "responseCount": sum(state.get("responseCount", 0) for state in answered),
+        }
+
+    async def get_search_results(self, search_id: str) -> Optional[List[Dict[str, Any]]]:
+        started = self._searches.get(search_id)
+        if not started:
+            return None
+        names = list(started)
+        batches = await asyncio.gather(
+            *(self.clients[name].get_search_results(started[name]) for name in names)
+        )
+        # The same peer often answers every backend; keep its fullest response
+        merged: Dict[str, Dict[str, Any]] = {}
+        for name, responses in zip(names, batches):
+            for response in responses or []:
+                peer = (response.get("username") or "").lower()
+                kept = merged.get(peer)
+                if kept is None:
+                    merged[peer] = dict(response, backends=[name])
+                    continue
+                kept["backends"].append(name)
+                if len(response.get("files", [])) > len(kept.get("files", [])):
+                    merged[peer] = dict(response, backends=kept["backends"])
+        return list(merged.values())
+
+    async def enqueue_files(
+        self, username: str, files: List[Dict[str, Any]]
+    ) -> Optional[bool]:
+        if not files:
+            return False
+        # Any backend can fetch from any peer, so try the least loaded first.
+        # Only move on when a backend can't be reached: after a peer timeout the
+        # first slskd may still queue the files, and a retry would fetch them twice
+        candidates = sorted(self._reachable(), key=lambda pair: self.load[pair[0]])
+        for name, client in candidates:
+            try:
+                result = await client.enqueue_files(username, files, raise_unreachable=True)
+            except SlskdUnreachable:
+                logger.warning(f"Backend {name} unreachable; trying the next one")
+                continue
+            if result:
+                self.load[name] += len(files)
+                logger.info(f"Enqueued {len(files)} file(s) from {username} on backend {name}")
+            return result
+        return None
+
+    async def get_all_downloads(
+        self, include_removed: bool = True
+    ) -> Optional[List[Dict[str, Any]]]:
+        names = list(self.clients)
+        batches = await asyncio.gather(
+            *(self.clients[name].get_all_downloads(include_removed) for name in names)
+        )
+        if all(batch is None for batch in batches):
+            return None
+        merged: List[Dict[str, Any]] = []
+        for name, records in zip(names, batches):
+            if records is None:
+                # Stale beats missing: an absent transfer looks like a dropped one
+                records = self._records[name]
+            else:
+                for record in records:
+                    record["backend"] = name
+                self._records[name] = records
+                self.load[name] = sum(
+                    1 for record in records if not (record.get("state") or "").startswith("Completed")
+                )
+            merged.extend(records)
+        self._transfer_backend = {
+            record["id"]: record["backend"] for record in merged if record.get("id")
+        }
+        return merged
+
+    async def remove_download(self, username: str, transfer_id: str) -> bool:
+        name = self._transfer_backend.get(transfer_id)
+        if name is None:
+            return False
+        return await self.clients[name].remove_download(username, transfer_id)
+
+    def _browser(self) -> Optional[AsyncSlskdClient]:
+        reachable = self._reachable()
+        if not reachable:
+            return None
+        return min(reachable, key=lambda pair: self.load[pair[0]])[1]
+
+    async def browse_user(self, username: str) -> Optional[Dict[str, Any]]:
+        client = self._browser()
+        return await client.browse_user(username) if client else None
+
+    async def get_directory(
+        self, username: str, directory: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        client = self._browser()
+        return await client.get_directory(username, directory) if client else None
+
+    async def get_application_state(self) -> Optional[Dict[str, Any]]:
+        names = list(self.clients)
+        states = await asyncio.gather(
+            *(self.clients[name].get_application_state() for name in names)
+        )
+        by_name = {name: state for name, state in zip(names, states) if state}
+        if not by_name:
             return None
+        for name in names:
+            server = (by_name.get(name) or {}).get("server") or {}
+            if not server.get("isLoggedIn"):
+                logger.warning(f"slskd backend {name} is unreachable or not logged in.")
+        logged_in = any(
+            (state.get("server") or {}).get("isLoggedIn") for state in by_name.values()
+        )
+        return {"server": {"isLoggedIn": logged_in}, "backends": by_name}
+
+
+def build_slskd_api():
+    """One client for a single backend, a pool when SLSKD_BACKENDS lists several."""
+    if len(SLSKD_BACKEND_CONFIGS) == 1:
+        _, url, key = SLSKD_BACKEND_CONFIGS[0]
+        return AsyncSlskdClient(url, key)
+    return SlskdBackendPool(SLSKD_BACKEND_CONFIGS)
 
 
 # --- Bot State & Pagination ---
@@ -103,11 +729,20 @@ class AsyncSlskdClient:
 # In-memory storage for search results and tracked downloads
 # { user_id: [list_of_search_results] }
 user_search_results: Dict[int, List[Dict[str, Any]]] = {}
-# { "username:filename": { ...info... } }
+# { "username:filename": { ...info..., "subscribers": [{user_id, channel_id}] } }
+# One entry per remote file; every Discord user who asked for it subscribes.
 tracked_downloads: Dict[str, Dict[str, Any]] = {}
+# { "username:directory": { name, total, completed, subscribers } }
 folder_notifications: Dict[str, Dict[str, Any]] = {}
+# { user_id: SearchResultPaginator } for the user's live search view
+user_paginators: Dict[int, "SearchResultPaginator"] = {}
+# { user_id: ResultPrefixIndex } built lazily for /dl autocomplete
+user_result_indexes: Dict[int, "ResultPrefixIndex"] = {}
 
 cog_instance: Optional["SlskdCog"] = None  # Populated once the cog loads
+app_commands_synced = False  # Slash commands are synced once per process
+
+AUTOCOMPLETE_LIMIT = 25  # Discord caps autocomplete choices at 25
 
 
 def _normalize_path(path: Optional[str]) -> str:
@@ -137,9 +772,13 @@ def display_filename(path: Optional[str]) -> str:
 
 
 def make_transfer_key(username: Optional[str], path: Optional[str]) -> str:
-    """Creates a normalized key for tracking downloads."""
+    """Creates a normalized key for tracking downloads.
+
+    Uses the full remote path: a peer's folders often share file names
+    (``01.flac``, ``cover.jpg``), and those are different files.
+    """
     safe_username = (username or "unknown").lower()
-    safe_path = _basename(path).lower()
+    safe_path = _normalize_path(path).lower()
     return f"{safe_username}:{safe_path}"
 
 
@@ -149,6 +788,29 @@ def make_folder_id(username: Optional[str], directory: Optional[str]) -> str:
     return f"{safe_username}:{safe_dir}"
 
 
+def add_subscriber(entry: Dict[str, Any], user_id: int, channel_id: int) -> bool:
+    """Subscribes a Discord user to a tracked file or folder; False if already there."""
+    subscribers = entry.setdefault("subscribers", [])
+    if any(sub["user_id"] == user_id for sub in subscribers):
+        return False
+    subscribers.append({"user_id": user_id, "channel_id": channel_id})
+    return True
+
+
+def remove_subscriber(entry: Dict[str, Any], user_id: int):
+    entry["subscribers"] = [
+        sub for sub in entry.get("subscribers", []) if sub["user_id"] != user_id
+    ]
+
+
+def apply_folder_listing(item: Dict[str, Any], files: List[Dict[str, Any]]):
+    """Points a folder row at a complete file list from a peer browse."""
+    item["files"] = files
+    item["file_count"] = len(files)
+    item["size_mb"] = round(sum(f.get("size", 0) or 0 for f in files) / (1024 * 1024), 2)
+    item["expanded"] = True
+
+
 def result_sort_key(item: Dict[str, Any]):
     norm = _normalize_path(item.get("path"))
     if norm:
@@ -160,133 +822,604 @@ def result_sort_key(item: Dict[str, Any]):
     return (username, segments, type_rank, item.get("display_name") or "")
 
 
+class ResultPrefixIndex:
+    """Sorted name index over a user's results for O(log n) prefix lookups.
+
+    Every result is indexed under its full display name and under each
+    following word, so "abbey" finds "The Beatles - Abbey Road".
+    """
+
+    def __init__(self, results: List[Dict[str, Any]]):
+        self.source = results
+        entries = []
+        for position, item in enumerate(results):
+            name = (
+                item.get("display_name") or display_filename(item.get("path"))
+            ).lower()
+            entries.append((name, position))
+            for word in name.split()[1:]:
+                entries.append((word, position))
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._positions = [position for _, position in entries]
+
+    def lookup(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[int]:
+        """Return up to ``limit`` result positions whose name matches ``prefix``."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._keys, prefix)
+        seen = set()
+        matches: List[int] = []
+        for i in range(start, len(self._keys)):
+            if not self._keys[i].startswith(prefix):
+                break
+            position = self._positions[i]
+            if position in seen:
+                continue
+            seen.add(position)
+            matches.append(position)
+            if len(matches) >= limit:
+                break
+        return sorted(matches)
+
+
+def get_user_prefix_index(user_id: int) -> Optional[ResultPrefixIndex]:
+    """Return the prefix index for a user's cached results, rebuilding if stale."""
+    results = user_search_results.get(user_id)
+    if results is None:
+        user_result_indexes.pop(user_id, None)
+        return None
+    index = user_result_indexes.get(user_id)
+    if index is None or index.source is not results:
+        index = ResultPrefixIndex(results)
+        user_result_indexes[user_id] = index
+    return index
+
+
+def resolve_selection(user_id: int, selection: str) -> Optional[int]:
+    """Map a `!dl` argument (1-based number or name prefix) to a result index."""
+    selection = selection.strip()
+    if selection.isdigit():
+        return int(selection) - 1
+    index = get_user_prefix_index(user_id)
+    if index is None or not selection:
+        return None
+    matches = index.lookup(selection)
+    lowered = selection.lower()
+    for position in matches:
+        item = index.source[position]
+        if (item.get("display_name") or "").lower() == lowered:
+            return position
+    if len(matches) == 1:
+        return matches[0]
+    return None
+
+
+def _extension(path: Optional[str]) -> str:
+    name = _basename(path)
+    if "." not in name:
+        return ""
+    return name.rsplit(".", 1)[-1].lower()
+
+
+# Sort fields accepted by !sort and whether they default to descending order
+SORT_FIELDS = {
+    "size": True,
+    "bitrate": True,
+    "speed": True,
+    "reliable": True,
+    "user": False,
+    "name": False,
+}
+
+
+def parse_filter_args(text: str) -> Dict[str, Any]:
+    """Parses `!filter` criteria into a filter spec.
+
+    Supported tokens: ``ext:flac,mp3``, ``bitrate:320`` (minimum kbps),
+    ``size:10-500`` (MB; ``10`` alone is a minimum),
+    ``free``, ``user:<name>``, ``type:file|folder``; bare words are matched
+    as substrings of the result name. Raises ValueError on malformed input.
+    """
+    spec: Dict[str, Any] = {}
+    words: List[str] = []
+    for token in text.split():
+        key, sep, value = token.partition(":")
+        key = key.lower()
+        if not sep:
+            if key in ("free", "slot", "slots"):
+                spec["free"] = True
+            else:
+                words.append(key)
+            continue
+        if not value:
+            raise ValueError(f"Missing value for `{key}`.")
+        if key in ("ext", "extension", "format"):
+            spec["ext"] = {v.lstrip(".").lower() for v in value.split(",") if v}
+        elif key in ("bitrate", "minbr", "br"):
+            if not value.isdigit():
+                raise ValueError("Bitrate must be a whole number of kbps.")
+            spec["min_bitrate"] = int(value)
+        elif key == "size":
+            low, _, high = value.partition("-")
+            try:
+                if low:
+                    spec["min_size"] = int(float(low) * 1024 * 1024)
+                if high:
+                    spec["max_size"] = int(float(high) * 1024 * 1024)
+            except ValueError:
+                raise ValueError("Size must look like `10-500`, `10-` or `-500` (MB).")
+        elif key == "user":
+            spec["user"] = value.lower()
+        elif key == "type":
+            if value.lower() not in ("file", "folder"):
+                raise ValueError("Type must be `file` or `folder`.")
+            spec["type"] = value.lower()
+        else:
+            raise ValueError(f"Unknown filter `{key}`.")
+    if words:
+        spec["text"] = words
+    return spec
+
+
+def describe_filter(spec: Dict[str, Any]) -> str:
+    parts = []
+    if "ext" in spec:
+        parts.append("ext:" + ",".join(sorted(spec["ext"])))
+    if "min_bitrate" in spec:
+        parts.append(f"bitrate≥{spec['min_bitrate']}")
+    if "min_size" in spec or "max_size" in spec:
+        low = round(spec.get("min_size", 0) / (1024 * 1024), 1)
+        high = spec.get("max_size")
+        high_text = f"{round(high / (1024 * 1024), 1)}" if high is not None else ""
+        parts.append(f"size:{low}-{high_text}MB")
+    if spec.get("free"):
+        parts.append("free slot")
+    if "user" in spec:
+        parts.append(f"user:{spec['user']}")
+    if "type" in spec:
+        parts.append(f"type:{spec['type']}")
+    for word in spec.get("text", []):
+        parts.append(f'"{word}"')
+    return " ".join(parts)
+
+
+class ResultTable:
+    """Columnar, array-backed copy of flattened results for fast filtering.
+
+    Numeric fields live in typed arrays, and the categorical fields (extension,
+    user, free slot, type) are pre-indexed to row-id arrays so most predicates
+    never touch the rows themselves. Range fields keep a sorted order plus
+    sorted values for bisect lookups, which doubles as the sort order.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.size = array("q")
+        self.bitrate = array("l")
+        self.speed = array("q")
+        # Expected speed from the peer's download history (see PeerReputation)
+        self.reliable = array("q")
+        self.names: List[str] = []
+        self.users: List[str] = []
+        self.by_ext: Dict[str, array] = {}
+        self.by_user: Dict[str, array] = {}
+        self.by_type: Dict[str, array] = {"file": array("I"), "folder": array("I")}
+        self.free_rows = array("I")
+
+        for row_id, item in enumerate(rows):
+            if item.get("type") == "folder":
+                files = item.get("files", [])
+                size = sum(f.get("size", 0) or 0 for f in files)
+                # A folder is only as good as its worst track; cover art, cue
+                # sheets and the like carry no bitrate and don't count
+                bitrate = min((f["bitRate"] for f in files if f.get("bitRate")), default=0)
+                extensions = {_extension(f.get("filename")) for f in files}
+            else:
+                file_info = item.get("file", {})
+                size = file_info.get("size", 0) or 0
+                bitrate = file_info.get("bitRate") or 0
+                extensions = {_extension(item.get("path"))}
+
+            user = (item.get("username") or "unknown").lower()
+            self.size.append(size)
+            self.bitrate.append(bitrate)
+            self.speed.append(int(item.get("speed_kb", 0) * 1024))
+            self.reliable.append(
+                int(peer_reputation.expected_speed(user, item.get("speed_kb", 0) * 1024))
+            )
+            self.names.append(
+                (item.get("display_name") or display_filename(item.get("path"))).lower()
+            )
+            self.users.append(user)
+            for ext in extensions:
+                if ext:
+                    self.by_ext.setdefault(ext, array("I")).append(row_id)
+            self.by_user.setdefault(user, array("I")).append(row_id)
+            self.by_type.setdefault(item.get("type") or "file", array("I")).append(row_id)
+            if item.get("slots_free"):
+                self.free_rows.append(row_id)
+
+        self._orders: Dict[str, array] = {}
+        self._size_sorted = array("q", (self.size[i] for i in self.order("size")))
+        self._bitrate_sorted = array("l", (self.bitrate[i] for i in self.order("bitrate")))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def order(self, field: str) -> array:
+        """Row ids in ascending order of ``field`` (cached per field)."""
+        cached = self._orders.get(field)
+        if cached is None:
+            column = {
+                "size": self.size,
+                "bitrate": self.bitrate,
+                "speed": self.speed,
+                "reliable": self.reliable,
+                "user": self.users,
+                "name": self.names,
+            }[field]
+            cached = array("I", sorted(range(len(self.rows)), key=column.__getitem__))
+            self._orders[field] = cached
+        return cached
+
+    def _range(self, field: str, values: array, low=None, high=None) -> array:
+        order = self.order(field)
+        start = bisect.bisect_left(values, low) if low is not None else 0
+        end = bisect.bisect_right(values, high) if high is not None else len(values)
+        return order[start:end]
+
+    def query(
+        self,
+        spec: Dict[str, Any],
+        sort_field: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Returns the rows matching ``spec``, optionally sorted by a field."""
+        candidates: List[array] = []
+        if "ext" in spec:
+            ids = array("I")
+            for ext in spec["ext"]:
+                ids.extend(self.by_ext.get(ext, ()))
+            candidates.append(ids)
+        if "user" in spec:
+            candidates.append(self.by_user.get(spec["user"], array("I")))
+        if "type" in spec:
+            candidates.append(self.by_type.get(spec["type"], array("I")))
+        if spec.get("free"):
+            candidates.append(self.free_rows)
+        if "min_bitrate" in spec:
+            candidates.append(
+                self._range("bitrate", self._bitrate_sorted, low=spec["min_bitrate"])
+            )
+        if "min_size" in spec or "max_size" in spec:
+            candidates.append(
+                self._range(
+                    "size",
+                    self._size_sorted,
+                    low=spec.get("min_size"),
+                    high=spec.get("max_size"),
+                )
+            )
+
+        selected: Optional[set] = None
+        for ids in sorted(candidates, key=len):
+            selected = set(ids) if selected is None else selected.intersection(ids)
+            if not selected:
+                return []
+
+        words = spec.get("text")
+        if words:
+            pool = selected if selected is not None else range(len(self.rows))
+            names = self.names
+            selected = {i for i in pool if all(w in names[i] for w in words)}
+
+        if sort_field:
+            ordered = self.order(sort_field)
+            if descending:
+                ordered = reversed(ordered)
+            if selected is None:
+                return [self.rows[i] for i in ordered]
+            return [self.rows[i] for i in ordered if i in selected]
+
+        if selected is None:
+            return list(self.rows)
+        return [self.rows[i] for i in sorted(selected)]
+
+
+# --- Search Result Processing ---
+class CancelToken:
+    """Set by the loop when a newer refresh supersedes in-flight processing."""
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class StaleResults(Exception):
+    """Raised inside result processing once its CancelToken is cancelled."""
+
+
+def flatten_search_responses(
+    results: List[Dict[str, Any]], cancel: Optional[CancelToken] = None
+) -> List[Dict[str, Any]]:
+    """Flattens the nested slskd result structure into a list of downloadable items."""
+    flat_list = []
+    for response_group in results:
+        if cancel is not None and cancel.cancelled:
+            raise StaleResults()
+        username = response_group.get("username")
+        token = response_group.get("token")
+
+        if not username or not token:
+            continue
+
+        folder_map: Dict[str, Dict[str, Any]] = {}
+        # Which slskd instance(s) saw this response, when running a pool
+        backends = response_group.get("backends") or []
+
+        # Add files
+        for file_info in response_group.get("files", []):
+            filename = file_info.get("filename", "")
+            display_name = display_filename(filename)
+            norm_path = _normalize_path(filename)
+            segments = tuple(norm_path.split("/")) if norm_path else ()
+            depth = max(len(segments) - 1, 0)
+            flat_list.append(
+                {
+                    "type": "file",
+                    "username": username,
+                    "token": token,
+                    "file": file_info,
+                    "path": filename,
+                    "display_name": display_name,
+                    "depth": depth,
+                    "size_mb": round(file_info.get("size", 0) / (1024 * 1024), 2),
+                    "slots_free": response_group.get("hasFreeUploadSlot", False),
+                    "speed_kb": round(
+                        response_group.get("uploadSpeed", 0) / 1024, 2
+                    ),
+                    "backends": backends,
+                }
+            )
+
+            directory = _dirname(filename)
+            if directory:
+                data = folder_map.setdefault(
+                    directory,
+                    {"files": [], "size": 0},
+                )
+                data["files"].append(file_info)
+                data["size"] += file_info.get("size", 0)
+
+        for directory, data in sorted(folder_map.items()):
+            folder_name = display_filename(directory) or directory or "Folder"
+            norm_dir = _normalize_path(directory)
+            segments = tuple(norm_dir.split("/")) if norm_dir else ()
+            depth = max(len(segments) - 1, 0)
+            flat_list.append(
+                {
+                    "type": "folder",
+                    "username": username,
+                    "token": token,
+                    "path": directory,
+                    "display_name": folder_name,
+                    "depth": depth,
+                    "files": data["files"],
+                    "file_count": len(data["files"]),
+                    "size_mb": round(data["size"] / (1024 * 1024), 2),
+                    "slots_free": response_group.get("hasFreeUploadSlot", False),
+                    "speed_kb": round(
+                        response_group.get("uploadSpeed", 0) / 1024, 2
+                    ),
+                    "backends": backends,
+                }
+            )
+
+    depth_by_user: Dict[str, int] = {}
+    for entry in flat_list:
+        user = entry.get("username", "unknown")
+        depth = entry.get("depth", 0)
+        current = depth_by_user.get(user)
+        if current is None or depth < current:
+            depth_by_user[user] = depth
+
+    for entry in flat_list:
+        user = entry.get("username", "unknown")
+        min_depth = depth_by_user.get(user, 0)
+        if min_depth:
+            entry["depth"] = max(entry.get("depth", 0) - min_depth, 0)
+
+    if cancel is not None and cancel.cancelled:
+        raise StaleResults()
+    flat_list.sort(key=result_sort_key)
+    return flat_list
+
+
+def _process_search_responses(
+    results: List[Dict[str, Any]],
+    expanded: Dict[str, List[Dict[str, Any]]],
+    token: Optional[CancelToken],
+    build_table: bool,
+) -> Tuple[List[Dict[str, Any]], Optional[ResultTable]]:
+    rows = flatten_search_responses(results, token)
+    if expanded:
+        for row in rows:
+            if row["type"] != "folder":
+                continue
+            files = expanded.get(make_folder_id(row["username"], row.get("path")))
+            if files is not None:
+                apply_folder_listing(row, files)
+    if token is not None and token.cancelled:
+        raise StaleResults()
+    return rows, ResultTable(rows) if build_table else None
+
+
+async def process_search_responses(
+    results: List[Dict[str, Any]],
+    expanded: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    token: Optional[CancelToken] = None,
+    build_table: bool = False,
+) -> Optional[Tuple[List[Dict[str, Any]], Optional[ResultTable]]]:
+    """Flattens, sorts and optionally indexes search responses.
+
+    Small result sets are processed inline. Anything with RESULT_OFFLOAD_FILES
+    files or more runs on a worker thread; the rows are built there and only
+    the finished list crosses back, so the loop never walks the responses.
+    Returns None if ``token`` was cancelled before the work finished.
+    """
+    total_files = sum(len(response.get("files") or ()) for response in results)
+    try:
+        if total_files < RESULT_OFFLOAD_FILES:
+            return _process_search_responses(results, expanded or {}, token, build_table)
+        return await asyncio.to_thread(
+            _process_search_responses, results, dict(expanded or {}), token, build_table
+        )
+    except StaleResults:
+        return None
+
+
 class SearchResultPaginator(View):
     """
     A Discord View for paginating through slskd search results.
     """
 
     def __init__(
-        self, ctx: commands.Context, results: List[Dict[str, Any]], query: str
+        self,
+        ctx: commands.Context,
+        results: List[Dict[str, Any]],
+        query: str,
+        rows: Optional[List[Dict[str, Any]]] = None,
+        title: Optional[str] = None,
     ):
         super().__init__(timeout=300)  # 5-minute timeout
         self.ctx = ctx
         self.query = query
-        self.all_results = self.flatten_results(results)
+        self.title = title or f"Search Results for '{query}'"
+        # { folder_id: complete file list } fetched by `!expand`
+        self.expanded: Dict[str, List[Dict[str, Any]]] = {}
+        # Pre-built rows (e.g. from `!browse`, or processed off-loop) skip flattening
+        self.all_results = rows if rows is not None else flatten_search_responses(results)
+        # Token for the refresh currently being processed, if any
+        self._refresh_token: Optional[CancelToken] = None
         self.per_page = 10
         self.current_page = 0
-        self.total_pages = -(
-            -len(self.all_results) // self.per_page
-        )  # Ceiling division
-
-        # Store these results for the '!dl' command
-        user_search_results[ctx.author.id] = self.all_results
+        # Active `!filter` / `!sort` state; view_results is what gets shown
+        self.filters: Dict[str, Any] = {}
+        self.sort_field: Optional[str] = None
+        self.sort_descending = False
+        self._table: Optional[ResultTable] = None
+        # Bumped when rows change in place, so an index built before is discarded
+        self._table_epoch = 0
+        self.view_results = self.all_results
+
+        previous = user_paginators.get(ctx.author.id)
+        if previous is not None:
+            previous.cancel_refresh()
+        user_paginators[ctx.author.id] = self
+        self.apply_view()
+
+    def cancel_refresh(self):
+        if self._refresh_token is not None:
+            self._refresh_token.cancel()
+            self._refresh_token = None
+
+    async def refresh_results(self, results: List[Dict[str, Any]]) -> bool:
+        """Update stored results; return True if list length changed.
+
+        A newer refresh, or a newer search by the same user, discards this one.
+        """
+        if user_paginators.get(self.ctx.author.id) is not self:
+            return False
+        self.cancel_refresh()
+        token = self._refresh_token = CancelToken()
+        expanded = dict(self.expanded)
+        processed = await process_search_responses(
+            results, expanded, token, build_table=bool(self.filters or self.sort_field)
+        )
+        if processed is None or token.cancelled:
+            return False
+        self._refresh_token = None
+        new_list, table = processed
+        if len(self.expanded) != len(expanded):
+            # `!expand` ran while the worker was busy
+            for row in new_list:
+                files = self.expanded.get(make_folder_id(row["username"], row.get("path")))
+                if row["type"] == "folder" and files is not None:
+                    apply_folder_listing(row, files)
+            table = None
+        changed = len(new_list) != len(self.all_results)
+        self.all_results = new_list
+        self._table = table
+        if table is None and (self.filters or self.sort_field):
+            await self.prepare_table()
+            if self.all_results is not new_list:
+                return False  # A newer refresh replaced these rows meanwhile
+        self.apply_view()
+        return changed
 
+    def apply_view(self):
+        """Re-derives the visible rows from the active filter and sort."""
+        if self.filters or self.sort_field:
+            if self._table is None:
+                self._table = ResultTable(self.all_results)
+            self.view_results = self._table.query(
+                self.filters, self.sort_field, self.sort_descending
+            )
+        else:
+            self.view_results = self.all_results
+        self.total_pages = max(1, -(-len(self.view_results) // self.per_page))
+        self.current_page = min(self.current_page, self.total_pages - 1)
+        # Store the visible rows so '!dl' numbering matches the page
+        user_search_results[self.ctx.author.id] = self.view_results
         self.update_buttons()
 
-    def flatten_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Flattens the nested slskd result structure into a list of downloadable items."""
-        flat_list = []
-        for response_group in results:
-            username = response_group.get("username")
-            token = response_group.get("token")
-
-            if not username or not token:
-                continue
-
-            folder_map: Dict[str, Dict[str, Any]] = {}
-
-            # Add files
-            for file_info in response_group.get("files", []):
-                filename = file_info.get("filename", "")
-                display_name = display_filename(filename)
-                norm_path = _normalize_path(filename)
-                segments = tuple(norm_path.split("/")) if norm_path else ()
-                depth = max(len(segments) - 1, 0)
-                flat_list.append(
-                    {
-                        "type": "file",
-                        "username": username,
-                        "token": token,
-                        "file": file_info,
-                        "path": filename,
-                        "display_name": display_name,
-                        "depth": depth,
-                        "size_mb": round(file_info.get("size", 0) / (1024 * 1024), 2),
-                        "slots_free": response_group.get("hasFreeUploadSlot", False),
-                        "speed_kb": round(
-                            response_group.get("uploadSpeed", 0) / 1024, 2
-                        ),
-                    }
-                )
+    async def expand_folder(self, item: Dict[str, Any], files: List[Dict[str, Any]]):
+        """Replaces a folder row's matched files with its full directory listing."""
+        self.expanded[make_folder_id(item["username"], item.get("path"))] = files
+        apply_folder_listing(item, files)
+        self._table = None
+        self._table_epoch += 1
+        if self.filters or self.sort_field:
+            await self.prepare_table()
+        self.apply_view()
+
+    async def prepare_table(self):
+        """Builds the filter/sort index for large result sets off the event loop."""
+        rows = self.all_results
+        epoch = self._table_epoch
+        if self._table is not None or len(rows) < RESULT_OFFLOAD_FILES:
+            return
+        table = await asyncio.to_thread(ResultTable, rows)
+        if self.all_results is rows and self._table is None and self._table_epoch == epoch:
+            self._table = table
 
-                directory = _dirname(filename)
-                if directory:
-                    data = folder_map.setdefault(
-                        directory,
-                        {"files": [], "size": 0},
-                    )
-                    data["files"].append(file_info)
-                    data["size"] += file_info.get("size", 0)
-
-            for directory, data in sorted(folder_map.items()):
-                folder_name = display_filename(directory) or directory or "Folder"
-                norm_dir = _normalize_path(directory)
-                segments = tuple(norm_dir.split("/")) if norm_dir else ()
-                depth = max(len(segments) - 1, 0)
-                flat_list.append(
-                    {
-                        "type": "folder",
-                        "username": username,
-                        "token": token,
-                        "path": directory,
-                        "display_name": folder_name,
-                        "depth": depth,
-                        "files": data["files"],
-                        "file_count": len(data["files"]),
-                        "size_mb": round(data["size"] / (1024 * 1024), 2),
-                        "slots_free": response_group.get("hasFreeUploadSlot", False),
-                        "speed_kb": round(
-                            response_group.get("uploadSpeed", 0) / 1024, 2
-                        ),
-                    }
-                )
+    def set_filters(self, spec: Dict[str, Any]):
+        self.filters = spec
+        self.current_page = 0
+        self.apply_view()
 
-        depth_by_user: Dict[str, int] = {}
-        for entry in flat_list:
-            user = entry.get("username", "unknown")
-            depth = entry.get("depth", 0)
-            current = depth_by_user.get(user)
-            if current is None or depth < current:
-                depth_by_user[user] = depth
-
-        for entry in flat_list:
-            user = entry.get("username", "unknown")
-            min_depth = depth_by_user.get(user, 0)
-            if min_depth:
-                entry["depth"] = max(entry.get("depth", 0) - min_depth, 0)
-
-        flat_list.sort(key=result_sort_key)
-        return flat_list
-
-    def refresh_results(self, results: List[Dict[str, Any]]) -> bool:
-        """Update stored results; return True if list length changed."""
-        new_list = self.flatten_results(results)
-        changed = len(new_list) != len(self.all_results)
-        self.all_results = new_list
-        self.total_pages = max(1, -(-len(self.all_results) // self.per_page))
-        self.current_page = min(self.current_page, self.total_pages - 1)
-        user_search_results[self.ctx.author.id] = self.all_results
-        self.update_buttons()
-        return changed
+    def set_sort(self, field: Optional[str], descending: bool = False):
+        self.sort_field = field
+        self.sort_descending = descending
+        self.current_page = 0
+        self.apply_view()
 
     def get_page_embed(self) -> discord.Embed:
         """Creates an embed for the current page of results."""
         embed = discord.Embed(
-            title=f"Search Results for '{self.query}'", color=discord.Color.blue()
+            title=self.title, color=discord.Color.blue()
         )
 
-        if not self.all_results:
-            embed.description = "No results found."
+        if not self.view_results:
+            embed.description = (
+                "No results match the current filter."
+                if self.all_results
+                else "No results found."
+            )
             return embed
 
         start_index = self.current_page * self.per_page
@@ -294,7 +1427,7 @@ class SearchResultPaginator(View):
 
         description_lines = []
         for i, item in enumerate(
-            self.all_results[start_index:end_index], start=start_index + 1
+            self.view_results[start_index:end_index], start=start_index + 1
         ):
             slots = "✅" if item["slots_free"] else "❌"
             display_name = item.get("display_name") or display_filename(item.get("path"))
@@ -302,9 +1435,10 @@ class SearchResultPaginator(View):
             prefix = (">" * depth + " ") if depth else ""
 
             if item["type"] == "folder":
+                complete = ", full" if item.get("expanded") else ""
                 name_block = (
                     "```ansi\n"
-                    f"\u001b[33m{prefix}📁 {display_name} ({item.get('file_count', 0)} files)\u001b[0m\n"
+                    f"\u001b[33m{prefix}📁 {display_name} ({item.get('file_count', 0)} files{complete})\u001b[0m\n"
                     "```"
                 )
             else:
@@ -314,12 +1448,26 @@ class SearchResultPaginator(View):
                 f"**{i}.** {name_block}\n"
                 f"   `[{item['type']}]` `[{item['size_mb']} MB]` `[{slots} Slot]` `[User: {item['username']}]`"
             )
+            if item.get("backends"):
+                line += f" `[via {'+'.join(item['backends'])}]`"
+            badge = peer_reputation.describe(item["username"])
+            if badge:
+                line += f" `[{badge}]`"
             description_lines.append(line)
 
         embed.description = "\n".join(description_lines)
+        if self.view_results is self.all_results:
+            totals = f"Total Results: {len(self.all_results)}"
+        else:
+            totals = f"Showing {len(self.view_results)} of {len(self.all_results)}"
+        view_state = describe_filter(self.filters)
+        if self.sort_field:
+            direction = "desc" if self.sort_descending else "asc"
+            view_state = f"{view_state} sort:{self.sort_field} {direction}".strip()
         embed.set_footer(
-            text=f"Page {self.current_page + 1} of {self.total_pages} | Total Results: {len(self.all_results)}\n"
-            f"Use !dl <number> to download."
+            text=f"Page {self.current_page + 1} of {self.total_pages} | {totals}\n"
+            + (f"Filter: {view_state}\n" if view_state else "")
+            + "Use !dl <number> to download, !filter / !sort to narrow."
         )
         return embed
 
@@ -387,8 +1535,10 @@ class SearchResultPaginator(View):
             )
             return
 
-        if self.ctx.author.id in user_search_results:
-            del user_search_results[self.ctx.author.id]
+        # A newer search, browse or wish view owns these now; leave it alone
+        if user_paginators.get(self.ctx.author.id) is self:
+            del user_paginators[self.ctx.author.id]
+            user_search_results.pop(self.ctx.author.id, None)
 
         await interaction.response.edit_message(
             content="Search cancelled and results cleared.", embed=None, view=None
@@ -396,9 +1546,10 @@ class SearchResultPaginator(View):
         self.stop()
 
     async def on_timeout(self):
-        # Clear results on timeout
-        if self.ctx.author.id in user_search_results:
-            del user_search_results[self.ctx.author.id]
+        # Clear results on timeout, unless a newer view owns them
+        if user_paginators.get(self.ctx.author.id) is self:
+            del user_paginators[self.ctx.author.id]
+            user_search_results.pop(self.ctx.author.id, None)
 
         # Disable view
         for item in self.children:
@@ -512,43 +1663,1134 @@ class DownloadProgressPaginator(View):
                 await self.message.edit(content="Progress view timed out.", view=self)
             except discord.NotFound:
                 pass
-# --- Bot Cog ---
-class SlskdCog(commands.Cog):
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
-        self.api = AsyncSlskdClient(SLSKD_API_URL, SLSKD_API_KEY)
-        self.download_monitor.start()
 
-    def cog_unload(self):
-        self.download_monitor.cancel()
-        asyncio.create_task(self.api.close())
-        logger.info("SlskdCog unloaded, API session close scheduled.")
-    async def safe_send(
+
+# --- Download Queue ---
+class DownloadQueueManager:
+    """Bot-side admission control in front of slskd's download queue.
+
+    Files are held here until a slot is free globally, for the remote peer and
+    for the requesting Discord user, then handed to slskd in per-peer batches.
+    Peers with higher observed throughput are served first; peers we have not
+    downloaded from yet are ranked by the upload speed their search response
+    advertised.
+    """
+
+    SPEED_SMOOTHING = 0.3  # EWMA weight of the newest throughput sample
+    MAX_ENQUEUE_ATTEMPTS = 3
+    UNSEEN_GRACE_SECONDS = 120  # How long a dispatched file may be missing from slskd
+
+    def __init__(
         self,
-        ctx: commands.Context,
-        content: Optional[str] = None,
-        prefer_reply: bool = True,
-        **kwargs,
+        api: AsyncSlskdClient,
+        max_active: int = MAX_ACTIVE_DOWNLOADS,
+        max_per_peer: int = MAX_DOWNLOADS_PER_PEER,
+        max_per_user: int = MAX_DOWNLOADS_PER_USER,
     ):
-        """Send a message without relying on message history permissions."""
-        if content is None and "embed" not in kwargs and "view" not in kwargs:
-            raise ValueError("safe_send requires content or embed/view")
+        self.api = api
+        self.max_active = max_active
+        self.max_per_peer = max_per_peer
+        self.max_per_user = max_per_user
+        # { peer: deque[job] } waiting for a slot
+        self.pending: Dict[str, deque] = {}
+        # { transfer_key: job } handed to slskd and not yet finished
+        self.in_flight: Dict[str, Dict[str, Any]] = {}
+        self.peer_active: Dict[str, int] = {}
+        self.user_active: Dict[int, int] = {}
+        # { peer: bytes/sec } smoothed from transfer averageSpeed samples
+        self.peer_speed: Dict[str, float] = {}
+        self._speed_hint: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def submit(
+        self,
+        requester_id: int,
+        peer: str,
+        files: List[Dict[str, Any]],
+        speed_hint: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """Queues enqueue payloads for ``peer`` and returns the created jobs."""
+        jobs = []
+        queue = self.pending.setdefault(peer, deque())
+        for payload in files:
+            job = {
+                "key": make_transfer_key(peer, payload.get("filename")),
+                "peer": peer,
+                "requester": requester_id,
+                "payload": payload,
+                "attempts": 0,
+            }
+            queue.append(job)
+            jobs.append(job)
+        if speed_hint:
+            self._speed_hint[peer] = max(self._speed_hint.get(peer, 0.0), speed_hint)
+        return jobs
+
+    def cancel(self, jobs: List[Dict[str, Any]]):
+        """Drops jobs that have not been dispatched yet."""
+        for job in jobs:
+            queue = self.pending.get(job["peer"])
+            if queue and job in queue:
+                queue.remove(job)
+                if not queue:
+                    del self.pending[job["peer"]]
+
+    def queued_keys(self) -> set:
+        """Transfer keys the bot still owns: waiting here or recently dispatched."""
+        keys = set(self.in_flight)
+        for queue in self.pending.values():
+            keys.update(job["key"] for job in queue)
+        return keys
+
+    def pending_count(self) -> int:
+        return sum(len(queue) for queue in self.pending.values())
+
+    def pending_jobs(self) -> List[Dict[str, Any]]:
+        return [job for queue in self.pending.values() for job in queue]
+
+    def has_work(self) -> bool:
+        return bool(self.pending or self.in_flight)
+
+    def _peer_rank(self, peer: str) -> float:
+        live = self.peer_speed.get(peer)
+        if live is not None:
+            return live
+        # No transfer from this peer yet this session; fall back on its history
+        return peer_reputation.expected_speed(peer, self._speed_hint.get(peer, 0.0))
+
+    def active_count(self) -> int:
+        """Dispatched jobs holding a slot; remotely queued ones do not."""
+        return sum(1 for job in self.in_flight.values() if not job.get("parked"))
+
+    def _select(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Picks the jobs that fit the current limits, grouped by peer."""
+        budget = self.max_active - self.active_count()
+        selected: Dict[str, List[Dict[str, Any]]] = {}
+        if budget <= 0:
+            return selected
+
+        user_active = dict(self.user_active)
+        for peer in sorted(self.pending, key=self._peer_rank, reverse=True):
+            queue = self.pending[peer]
+            peer_room = self.max_per_peer - self.peer_active.get(peer, 0)
+            for job in list(queue):
+                if budget <= 0 or peer_room <= 0:
+                    break
+                if user_active.get(job["requester"], 0) >= self.max_per_user:
+                    continue
+                queue.remove(job)
+                selected.setdefault(peer, []).append(job)
+                user_active[job["requester"]] = user_active.get(job["requester"], 0) + 1
+                peer_room -= 1
+                budget -= 1
+            if not queue:
+                del self.pending[peer]
+            if budget <= 0:
+                break
+        return selected
 
-        if prefer_reply:
-            try:
-                return await ctx.reply(content, **kwargs)
-            except discord.Forbidden:
-                pass
+    def _mark_active(self, job: Dict[str, Any]):
+        job["dispatched_at"] = time.monotonic()
+        job["parked"] = False
+        self.in_flight[job["key"]] = job
+        self._take_slot(job)
 
-        try:
-            return await ctx.send(content, **kwargs)
-        except discord.Forbidden:
-            logger.warning(
-                "Missing permission to send messages in channel %s", ctx.channel
-            )
-            return None
+    def _take_slot(self, job: Dict[str, Any]):
+        self.peer_active[job["peer"]] = self.peer_active.get(job["peer"], 0) + 1
+        self.user_active[job["requester"]] = self.user_active.get(job["requester"], 0) + 1
 
-    async def trigger_navidrome_scan(self):
+    def _release(self, key: str):
+        job = self.in_flight.pop(key, None)
+        if job is None or job.get("parked"):
+            return
+        self._free_slot(job)
+
+    def _free_slot(self, job: Dict[str, Any]):
+        for counts, owner in (
+            (self.peer_active, job["peer"]),
+            (self.user_active, job["requester"]),
+        ):
+            remaining = counts.get(owner, 0) - 1
+            if remaining > 0:
+                counts[owner] = remaining
+            else:
+                counts.pop(owner, None)
+
+    async def dispatch(self) -> List[Dict[str, Any]]:
+        """Hands every job that fits the limits to slskd.
+
+        Returns the jobs whose enqueue call failed. Failed jobs go back to the
+        front of their peer's queue until they run out of attempts.
+        """
+        # Claim slots under the lock, but enqueue outside it: one slow or
+        # offline peer must not hold up a user's `!dl` behind it
+        async with self._lock:
+            selected = self._select()
+            for jobs in selected.values():
+                for job in jobs:
+                    self._mark_active(job)
+        if not selected:
+            return []
+
+        results = await asyncio.gather(
+            *(
+                self.api.enqueue_files(peer, [job["payload"] for job in jobs])
+                for peer, jobs in selected.items()
+            ),
+            return_exceptions=True,
+        )
+
+        failed: List[Dict[str, Any]] = []
+        async with self._lock:
+            for (peer, jobs), success in zip(selected.items(), results):
+                if isinstance(success, BaseException):
+                    logger.error(f"Error enqueueing files from {peer}: {success}")
+                elif success:
+                    continue
+                logger.warning(f"Failed to enqueue {len(jobs)} file(s) from {peer}")
+                queue = self.pending.setdefault(peer, deque())
+                for job in reversed(jobs):
+                    self._release(job["key"])
+                    job["attempts"] += 1
+                    failed.append(job)
+                    if job["attempts"] < self.MAX_ENQUEUE_ATTEMPTS:
+                        queue.appendleft(job)
+                if not queue:
+                    del self.pending[peer]
+        return failed
+
+    def observe(self, states: Dict[str, Dict[str, Any]]):
+        """Updates slots and throughput from one poll of slskd's transfers.
+
+        ``states`` maps transfer keys to ``{"complete": bool, "speed": float,
+        "remote_queued": bool}``. A transfer waiting in the peer's upload queue
+        gives its slot back until it starts, so busy peers cannot starve the
+        others.
+        """
+        now = time.monotonic()
+        for key, job in list(self.in_flight.items()):
+            state = states.get(key)
+            if state is None:
+                if now - job["dispatched_at"] > self.UNSEEN_GRACE_SECONDS:
+                    self._release(key)
+                continue
+
+            speed = state.get("speed") or 0.0
+            if speed > 0:
+                previous = self.peer_speed.get(job["peer"])
+                self.peer_speed[job["peer"]] = (
+                    speed
+                    if previous is None
+                    else previous + self.SPEED_SMOOTHING * (speed - previous)
+                )
+            if state.get("complete"):
+                self._release(key)
+            elif state.get("remote_queued") != job["parked"]:
+                job["parked"] = bool(state.get("remote_queued"))
+                if job["parked"]:
+                    self._free_slot(job)
+                else:
+                    self._take_slot(job)
+
+
+# --- Peer Browse ---
+def _path_segments(path: Optional[str]) -> List[str]:
+    normalized = _normalize_path(path)
+    return normalized.split("/") if normalized else []
+
+
+class ShareTrie:
+    """Compact directory tree of one peer's share.
+
+    Nodes are ``(children, files)`` tuples, path segments are interned and
+    files are stored as ``(name, size, bitrate)`` tuples, so a large share
+    costs a fraction of the JSON it came from.
+    """
+
+    __slots__ = ("root", "loaded", "complete")
+
+    def __init__(self):
+        self.root: Tuple[Dict[str, Any], List[Tuple[str, int, int]]] = ({}, [])
+        # Directories whose file lists are known; everything if complete
+        self.loaded: set = set()
+        self.complete = False
+
+    def _node(self, path: Optional[str], create: bool = False):
+        node = self.root
+        for segment in _path_segments(path):
+            children = node[0]
+            child = children.get(segment)
+            if child is None:
+                if not create:
+                    return None
+                child = children[sys.intern(segment)] = ({}, [])
+            node = child
+        return node
+
+    def add_directory(self, path: str, files: List[Dict[str, Any]]):
+        node = self._node(path, create=True)
+        node[1][:] = [
+            (
+                sys.intern(_basename(f.get("filename"))),
+                f.get("size", 0) or 0,
+                f.get("bitRate") or 0,
+            )
+            for f in files
+        ]
+        self.loaded.add(_normalize_path(path).lower())
+
+    def has_directory(self, path: Optional[str]) -> bool:
+        if self.complete:
+            return self._node(path) is not None
+        return _normalize_path(path).lower() in self.loaded
+
+    def listing(self, path: Optional[str]):
+        """Returns ``(subdirectory names, files)`` at ``path``, or None if unknown."""
+        node = self._node(path)
+        if node is None:
+            return None
+        return sorted(node[0], key=str.lower), node[1]
+
+    def file_payloads(self, path: Optional[str]) -> List[Dict[str, Any]]:
+        """Enqueue-ready file dicts for the files directly inside ``path``."""
+        node = self._node(path)
+        if node is None:
+            return []
+        prefix = "\\".join(_path_segments(path))
+        return [
+            {
+                "filename": f"{prefix}\\{name}" if prefix else name,
+                "size": size,
+                "bitRate": bitrate,
+            }
+            for name, size, bitrate in node[1]
+        ]
+
+
+class BrowseCache:
+    """TTL cache of peer share listings, shared by every Discord user.
+
+    Whole shares come from slskd's browse endpoint; single folders come from
+    the directory endpoint and are merged into the same per-peer trie.
+    Concurrent requests for the same listing share one network call.
+    """
+
+    def __init__(
+        self,
+        api: AsyncSlskdClient,
+        ttl: float = BROWSE_CACHE_TTL,
+        max_peers: int = BROWSE_CACHE_PEERS,
+    ):
+        self.api = api
+        self.ttl = ttl
+        self.max_peers = max_peers
+        # { peer: (expires_at, ShareTrie) } in least-recently-used order
+        self._entries: "OrderedDict[str, Tuple[float, ShareTrie]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    def _get(self, peer: str) -> Optional[ShareTrie]:
+        entry = self._entries.get(peer.lower())
+        if entry is None:
+            return None
+        expires_at, trie = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[peer.lower()]
+            return None
+        self._entries.move_to_end(peer.lower())
+        return trie
+
+    def _trie_for_update(self, peer: str) -> ShareTrie:
+        trie = self._get(peer)
+        if trie is None:
+            trie = ShareTrie()
+        self._entries[peer.lower()] = (time.monotonic() + self.ttl, trie)
+        self._entries.move_to_end(peer.lower())
+        while len(self._entries) > self.max_peers:
+            self._entries.popitem(last=False)
+        return trie
+
+    async def _once(self, key: Tuple[str, str], fetch):
+        """Runs ``fetch`` once per key even if several users ask concurrently."""
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case nobody else is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def share(self, peer: str) -> Optional[ShareTrie]:
+        """The peer's whole share, browsing it only on a cache miss."""
+        trie = self._get(peer)
+        if trie is not None and trie.complete:
+            return trie
+
+        async def fetch():
+            response = await self.api.browse_user(peer)
+            if response is None:
+                return None
+            trie = self._trie_for_update(peer)
+            # lockedDirectories are left out: the peer refuses to upload from them
+            for directory in response.get("directories", []):
+                trie.add_directory(directory.get("name", ""), directory.get("files", []))
+            trie.complete = True
+            return trie
+
+        return await self._once((peer.lower(), ""), fetch)
+
+    async def directory(self, peer: str, path: str) -> Optional[List[Dict[str, Any]]]:
+        """Every file directly inside one of the peer's folders."""
+        trie = self._get(peer)
+        if trie is not None and trie.has_directory(path):
+            return trie.file_payloads(path)
+
+        async def fetch():
+            response = await self.api.get_directory(peer, path.replace("/", "\\"))
+            if response is None:
+                return None
+            trie = self._trie_for_update(peer)
+            for directory in response:
+                trie.add_directory(directory.get("name") or path, directory.get("files", []))
+            return trie.file_payloads(path)
+
+        return await self._once((peer.lower(), _normalize_path(path).lower()), fetch)
+
+
+def browse_rows(peer: str, trie: ShareTrie, path: str) -> Optional[List[Dict[str, Any]]]:
+    """Builds paginator rows (folders first, then files) for one browse level."""
+    listing = trie.listing(path)
+    if listing is None:
+        return None
+    subdirectories, files = listing
+    base = "\\".join(_path_segments(path))
+    rows: List[Dict[str, Any]] = []
+    for name in subdirectories:
+        full_path = f"{base}\\{name}" if base else name
+        folder_files = trie.file_payloads(full_path)
+        rows.append(
+            {
+                "type": "folder",
+                "username": peer,
+                "token": None,
+                "path": full_path,
+                "display_name": name,
+                "depth": 0,
+                "files": folder_files,
+                "file_count": len(folder_files),
+                "size_mb": round(sum(f["size"] for f in folder_files) / (1024 * 1024), 2),
+                "slots_free": False,
+                "speed_kb": 0,
+                "expanded": True,
+            }
+        )
+    for name, size, bitrate in files:
+        full_path = f"{base}\\{name}" if base else name
+        rows.append(
+            {
+                "type": "file",
+                "username": peer,
+                "token": None,
+                "file": {"filename": full_path, "size": size, "bitRate": bitrate},
+                "path": full_path,
+                "display_name": name,
+                "depth": 0,
+                "size_mb": round(size / (1024 * 1024), 2),
+                "slots_free": False,
+                "speed_kb": 0,
+            }
+        )
+    return rows
+
+
+# --- Transfer Retention ---
+class TransferRetentionManager:
+    """Removes finished downloads from slskd under a retention policy.
+
+    Downloads the bot has notified about are removed ``retention`` seconds
+    after they were first seen finished; finished downloads the bot never
+    tracked get ``untracked_retention`` seconds. At most ``batch_size``
+    removals go out per sweep so a large backlog drains over a few ticks.
+    """
+
+    SWEEP_INTERVAL = 600  # Seconds between sweeps while nothing is tracked
+
+    def __init__(
+        self,
+        api: AsyncSlskdClient,
+        enabled: bool = TRANSFER_PRUNING,
+        retention: float = TRANSFER_RETENTION_SECONDS,
+        untracked_retention: float = UNTRACKED_TRANSFER_RETENTION_SECONDS,
+        batch_size: int = TRANSFER_PRUNE_BATCH,
+    ):
+        self.api = api
+        self.enabled = enabled
+        self.retention = retention
+        self.untracked_retention = untracked_retention
+        self.batch_size = batch_size
+        self.removed_total = 0
+        # { transfer id: monotonic time it was first seen finished }
+        self._finished_at: Dict[str, float] = {}
+        self._last_sweep = time.monotonic()
+
+    def sweep_due(self) -> bool:
+        return self.enabled and time.monotonic() - self._last_sweep >= self.SWEEP_INTERVAL
+
+    def candidates(
+        self,
+        records: List[Dict[str, Any]],
+        tracked: Dict[str, Dict[str, Any]],
+    ) -> List[Tuple[str, str, str]]:
+        """Returns ``(username, id, key)`` for finished downloads past retention.
+
+        Only the record's own state counts, so a live transfer is never removed
+        (removal cancels it) because some other record looks finished.
+        """
+        now = time.monotonic()
+        seen: Dict[str, float] = {}
+        due = []
+        for record in records:
+            transfer_id = record.get("id")
+            state = (record.get("state") or "").lower()
+            if not transfer_id or not state.startswith("completed"):
+                continue
+            key = make_transfer_key(record["username"], record.get("filename"))
+            finished_at = seen[transfer_id] = self._finished_at.get(transfer_id, now)
+            info = tracked.get(key)
+            if info is None:
+                limit = self.untracked_retention
+            elif info["notified"]:
+                limit = self.retention
+            else:
+                continue  # Finished but nobody has been told yet
+            if now - finished_at >= limit:
+                due.append((record["username"], transfer_id, key))
+        # Forget transfers that are gone so the map can't grow without bound
+        self._finished_at = seen
+        return due
+
+    async def prune(self, due: List[Tuple[str, str, str]]) -> List[str]:
+        """Removes one batch of due transfers; returns the keys removed."""
+        self._last_sweep = time.monotonic()
+        batch = due[: self.batch_size]
+        if not batch:
+            return []
+        results = await asyncio.gather(
+            *(self.api.remove_download(username, transfer_id) for username, transfer_id, _ in batch)
+        )
+        removed = []
+        for (_, transfer_id, key), ok in zip(batch, results):
+            if ok:
+                self._finished_at.pop(transfer_id, None)
+                removed.append(key)
+        self.removed_total += len(removed)
+        if removed:
+            logger.info(
+                f"Pruned {len(removed)} finished transfer(s) from slskd "
+                f"({len(due) - len(removed)} still due)."
+            )
+        return removed
+
+
+# --- Persistence ---
+def write_json_atomic(path: str, payload: Dict[str, Any]):
+    """Writes JSON next to ``path`` and renames it over, so a crash never truncates it."""
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error(f"Could not save {path}: {e}")
+
+
+def read_json(path: str) -> Optional[Dict[str, Any]]:
+    """Loads a state file; None if it doesn't exist yet or can't be read."""
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read {path}: {e}")
+        return None
+
+
+# --- Peer Reputation ---
+def _parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds for an slskd timestamp (which carries 7 fractional digits)."""
+    if not value or len(value) < 19:
+        return None
+    try:
+        base = datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return None
+    digits = ""
+    if value[19:20] == ".":
+        for char in value[20:]:
+            if not char.isdigit():
+                break
+            digits += char
+    return base.replace(tzinfo=timezone.utc).timestamp() + (float("0." + digits) if digits else 0.0)
+
+
+class PeerReputation:
+    """Rolling, decaying download history per remote peer.
+
+    Each peer is one list of floats: when it was last updated, decayed
+    success / failure / reject counts, and decayed sums and weights for
+    achieved throughput and time spent in the peer's upload queue. Every
+    field halves over ``half_life`` seconds, so old behaviour fades out
+    and the ratios stay meaningful. The table is saved as JSON.
+    """
+
+    UPDATED, SUCCESSES, FAILURES, REJECTS, SPEED_SUM, SPEED_WEIGHT, QUEUE_SUM, QUEUE_WEIGHT = range(8)
+    SAVE_INTERVAL = 60  # Seconds between writes while there are changes
+    # Ended on our side, so not the peer's fault. Any other non-successful
+    # Completed state (Errored, TimedOut, Aborted, ...) counts as a failure.
+    NEUTRAL_STATES = ("completed, cancelled",)
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        half_life_days: float = PEER_STATS_HALF_LIFE_DAYS,
+        max_peers: int = PEER_STATS_MAX_PEERS,
+    ):
+        self.path = path or os.path.join(BOT_DATA_DIR, "peer_stats.json")
+        self.half_life = half_life_days * 86400
+        self.max_peers = max_peers
+        # { lowercased peer: [updated, successes, failures, rejects, ...] }
+        self.peers: Dict[str, List[float]] = {}
+        # Transfer ids already counted; bounded by what slskd still lists
+        self._counted: set = set()
+        self.dirty = False
+        self._last_save = time.monotonic()
+
+    def load(self):
+        data = read_json(self.path)
+        if data is None:
+            return
+        self.peers = {
+            peer: [float(value) for value in stats]
+            for peer, stats in data.get("peers", {}).items()
+            if len(stats) == 8
+        }
+        self._counted = set(data.get("counted", []))
+        logger.info(f"Loaded stats for {len(self.peers)} peers from {self.path}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A copy that can be written from another thread."""
+        if len(self.peers) > self.max_peers:
+            now = time.time()
+            keep = sorted(self.peers, key=lambda peer: self._events(peer, now), reverse=True)
+            self.peers = {peer: self.peers[peer] for peer in keep[: self.max_peers]}
+        return {
+            "peers": {peer: list(stats) for peer, stats in self.peers.items()},
+            "counted": list(self._counted),
+        }
+
+    def write(self, payload: Dict[str, Any]):
+        write_json_atomic(self.path, payload)
+
+    def save_due(self) -> bool:
+        return self.dirty and time.monotonic() - self._last_save >= self.SAVE_INTERVAL
+
+    def mark_saved(self):
+        self.dirty = False
+        self._last_save = time.monotonic()
+
+    def _decayed(self, peer: str, now: float) -> List[float]:
+        stats = self.peers.get(peer)
+        if stats is None:
+            stats = self.peers[peer] = [now, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+            return stats
+        factor = 0.5 ** (max(now - stats[self.UPDATED], 0.0) / self.half_life)
+        for index in range(1, 8):
+            stats[index] *= factor
+        stats[self.UPDATED] = now
+        return stats
+
+    def record(
+        self,
+        peer: str,
+        outcome: str,
+        speed: Optional[float] = None,
+        queue_seconds: Optional[float] = None,
+    ):
+        """Adds one finished transfer: ``outcome`` is success, failure or reject."""
+        stats = self._decayed(peer.lower(), time.time())
+        if outcome == "success":
+            stats[self.SUCCESSES] += 1
+            if speed:
+                stats[self.SPEED_SUM] += speed
+                stats[self.SPEED_WEIGHT] += 1
+        elif outcome == "reject":
+            stats[self.REJECTS] += 1
+        else:
+            stats[self.FAILURES] += 1
+        if queue_seconds is not None and queue_seconds >= 0:
+            stats[self.QUEUE_SUM] += queue_seconds
+            stats[self.QUEUE_WEIGHT] += 1
+        self.dirty = True
+
+    def observe(self, records: List[Dict[str, Any]]):
+        """Counts every transfer that reached a final state since the last poll."""
+        listed = set()
+        for record in records:
+            transfer_id = record.get("id")
+            if not transfer_id:
+                continue
+            listed.add(transfer_id)
+            if transfer_id in self._counted:
+                continue
+            state = (record.get("state") or "").lower()
+            if state == "completed, succeeded":
+                outcome = "success"
+            elif state == "completed, rejected":
+                outcome = "reject"
+            elif state.startswith("completed") and state not in self.NEUTRAL_STATES:
+                outcome = "failure"
+            else:
+                continue  # Still running, or cancelled on our side
+            self._counted.add(transfer_id)
+            queued = _parse_timestamp(record.get("enqueuedAt") or record.get("requestedAt"))
+            started = _parse_timestamp(record.get("startedAt"))
+            self.record(
+                record["username"],
+                outcome,
+                speed=record.get("averageSpeed") if outcome == "success" else None,
+                queue_seconds=started - queued if queued and started else None,
+            )
+        # Transfers slskd no longer lists can't be counted twice
+        if self._counted - listed:
+            self._counted &= listed
+            self.dirty = True
+
+    def _events(self, peer: str, now: float) -> float:
+        stats = self.peers.get(peer)
+        if stats is None:
+            return 0.0
+        factor = 0.5 ** (max(now - stats[self.UPDATED], 0.0) / self.half_life)
+        return (stats[self.SUCCESSES] + stats[self.FAILURES] + stats[self.REJECTS]) * factor
+
+    def success_rate(self, peer: str) -> float:
+        """Share of finished transfers that succeeded, pulled towards 50% when sparse."""
+        stats = self.peers.get(peer.lower())
+        if stats is None:
+            return 0.5
+        total = stats[self.SUCCESSES] + stats[self.FAILURES] + stats[self.REJECTS]
+        return (stats[self.SUCCESSES] + 1) / (total + 2)
+
+    def throughput(self, peer: str) -> Optional[float]:
+        """Mean achieved download speed in bytes/s, if any download succeeded."""
+        stats = self.peers.get(peer.lower())
+        if not stats or stats[self.SPEED_WEIGHT] <= 0:
+            return None
+        return stats[self.SPEED_SUM] / stats[self.SPEED_WEIGHT]
+
+    def queue_wait(self, peer: str) -> Optional[float]:
+        stats = self.peers.get(peer.lower())
+        if not stats or stats[self.QUEUE_WEIGHT] <= 0:
+            return None
+        return stats[self.QUEUE_SUM] / stats[self.QUEUE_WEIGHT]
+
+    def expected_speed(self, peer: str, advertised: float = 0.0) -> float:
+        """Throughput we expect to actually get, for ranking sources.
+
+        Uses what the peer delivered before (or ``advertised`` if it never has),
+        scaled by how often its transfers succeed.
+        """
+        speed = self.throughput(peer)
+        return (speed if speed is not None else advertised) * self.success_rate(peer)
+
+    def describe(self, peer: str) -> str:
+        """Short badge for result listings; empty for peers with no history."""
+        peer = peer.lower()
+        if self._events(peer, time.time()) < 0.5:
+            return ""
+        parts = [f"★ {self.success_rate(peer) * 100:.0f}%"]
+        speed = self.throughput(peer)
+        if speed is not None:
+            parts.append(f"{speed / (1024 * 1024):.1f} MB/s")
+        wait = self.queue_wait(peer)
+        if wait is not None and wait >= 60:
+            parts.append(f"wait {wait / 60:.0f}m")
+        return " · ".join(parts)
+
+
+# Shared so result tables and the download queue can rank sources
+peer_reputation = PeerReputation()
+
+
+# --- Wishlist ---
+def wish_match_id(item: Dict[str, Any]) -> str:
+    """Compact digest identifying a result row across searches."""
+    if item["type"] == "folder":
+        ident = "dir:" + make_folder_id(item["username"], item.get("path"))
+    else:
+        ident = make_transfer_key(item["username"], item.get("path"))
+    return hashlib.blake2b(ident.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def wish_rank(item: Dict[str, Any]):
+    """Best auto-download candidate first: folders, free slots, then expected speed."""
+    return (
+        item["type"] == "folder",
+        bool(item.get("slots_free")),
+        peer_reputation.expected_speed(item["username"], item.get("speed_kb", 0) * 1024),
+    )
+
+
+class Wishlist:
+    """Saved searches that are re-run in the background until something turns up.
+
+    Identical queries from different users share one wish (and one search);
+    each user is a subscriber, optionally with auto-download. Every wish
+    remembers the results it has already reported, so only new matches
+    are announced on later searches.
+    """
+
+    SEEN_LIMIT = 1000  # Result ids remembered per wish, or its largest search if bigger
+    LATEST_LIMIT = 50  # New matches kept in memory for `!wish show`
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        recheck: float = WISHLIST_RECHECK_SECONDS,
+        per_user: int = WISHES_PER_USER,
+    ):
+        self.path = path or os.path.join(BOT_DATA_DIR, "wishlist.json")
+        self.recheck = recheck
+        self.per_user = per_user
+        # { normalized query: { query, created, last_searched, hits, seen, subscribers } }
+        self.wishes: Dict[str, Dict[str, Any]] = {}
+        # { normalized query: rows } from the last search that found something new
+        self.latest: Dict[str, List[Dict[str, Any]]] = {}
+        self.dirty = False
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def load(self):
+        data = read_json(self.path)
+        if data is None:
+            return
+        self.wishes = data.get("wishes", {})
+        logger.info(f"Loaded {len(self.wishes)} wishes from {self.path}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "wishes": {
+                key: dict(
+                    wish,
+                    subscribers=[dict(sub) for sub in wish["subscribers"]],
+                    seen=list(wish["seen"]),
+                )
+                for key, wish in self.wishes.items()
+            }
+        }
+
+    def for_user(self, user_id: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """The user's wishes in the order `!wish` lists them."""
+        mine = [
+            (key, wish)
+            for key, wish in self.wishes.items()
+            if any(sub["user_id"] == user_id for sub in wish["subscribers"])
+        ]
+        return sorted(mine, key=lambda pair: pair[1]["created"])
+
+    def add(self, query: str, user_id: int, channel_id: int, auto: bool) -> Tuple[str, bool]:
+        """Subscribes the user; returns the wish key and whether the wish is new.
+
+        Raises ValueError when the user is at their wish limit.
+        """
+        key = self.normalize(query)
+        wish = self.wishes.get(key)
+        subscribed = wish is not None and any(
+            sub["user_id"] == user_id for sub in wish["subscribers"]
+        )
+        if not subscribed and len(self.for_user(user_id)) >= self.per_user:
+            raise ValueError(f"You already have {self.per_user} wishes; remove one first.")
+        created = wish is None
+        if created:
+            wish = self.wishes[key] = {
+                "query": " ".join(query.split()),
+                "created": time.time(),
+                "last_searched": 0.0,
+                "hits": 0,
+                "seen": [],
+                "subscribers": [],
+            }
+        remove_subscriber(wish, user_id)
+        wish["subscribers"].append({"user_id": user_id, "channel_id": channel_id, "auto": auto})
+        self.dirty = True
+        return key, created
+
+    def remove(self, key: str, user_id: int):
+        wish = self.wishes.get(key)
+        if wish is None:
+            return
+        remove_subscriber(wish, user_id)
+        if not wish["subscribers"]:
+            del self.wishes[key]
+            self.latest.pop(key, None)
+        self.dirty = True
+
+    def due(self, limit: int) -> List[str]:
+        """Wishes whose recheck interval has passed, longest-waiting first."""
+        cutoff = time.time() - self.recheck
+        waiting = [key for key, wish in self.wishes.items() if wish["last_searched"] <= cutoff]
+        waiting.sort(key=lambda key: self.wishes[key]["last_searched"])
+        return waiting[:limit]
+
+    def mark_searched(self, key: str):
+        wish = self.wishes.get(key)
+        if wish is not None:
+            wish["last_searched"] = time.time()
+            self.dirty = True
+
+    def evaluate(self, key: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Returns the rows this wish hasn't reported before and remembers them."""
+        wish = self.wishes.get(key)
+        if wish is None:
+            return []
+        seen = set(wish["seen"])
+        ids = [wish_match_id(row) for row in rows]
+        new_rows = [row for row, match_id in zip(rows, ids) if match_id not in seen]
+        if not new_rows:
+            return []
+        # The latest search is kept whole, plus a window of older ids that grows
+        # to the largest search this wish has returned, so a result set seen
+        # before isn't pushed out by a smaller one and announced again
+        current = list(dict.fromkeys(ids))
+        current_set = set(current)
+        window = wish["window"] = max(self.SEEN_LIMIT, wish.get("window", 0), len(current))
+        older = [match_id for match_id in wish["seen"] if match_id not in current_set]
+        wish["seen"] = older[-window:] + current
+        wish["hits"] += len(new_rows)
+        self.latest[key] = sorted(new_rows, key=wish_rank, reverse=True)[: self.LATEST_LIMIT]
+        self.dirty = True
+        return new_rows
+
+
+class WishContext:
+    """Stands in for ``commands.Context`` so background wishes reuse the `!dl` path.
+
+    Replies go to the channel the wish was made in, mentioning its owner.
+    """
+
+    def __init__(self, bot: commands.Bot, user_id: int, channel_id: int):
+        self.bot = bot
+        self.author = discord.Object(id=user_id)
+        self.channel = discord.Object(id=channel_id)
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        kwargs.pop("ephemeral", None)
+        channel = self.bot.get_channel(self.channel.id) or await self.bot.fetch_channel(
+            self.channel.id
+        )
+        if content is not None:
+            content = f"<@{self.author.id}> {content}"
+        return await channel.send(content, **kwargs)
+
+    reply = send
+
+
+# --- Diagnostics ---
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def _blocking_coroutine(frame) -> str:
+    """Names the innermost coroutine on a stack, i.e. the one doing sync work."""
+    while frame is not None:
+        code = frame.f_code
+        if code.co_flags & inspect.CO_COROUTINE:
+            name = getattr(code, "co_qualname", code.co_name)
+            return f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        frame = frame.f_back
+    return "non-coroutine callback"
+
+
+class LoopWatchdog:
+    """Always-on event-loop lag monitor.
+
+    A heartbeat task records how late each short sleep wakes up. A daemon
+    thread notices when the heartbeat stops while the loop is blocked, then
+    grabs the loop thread's stack and logs the coroutine responsible. This
+    is like asyncio's debug-mode slow-callback warning, but cheap enough to
+    leave on in production.
+    """
+
+    STACK_DEPTH = 15  # Frames logged per stall
+
+    def __init__(
+        self,
+        threshold: float = LOOP_LAG_THRESHOLD_MS / 1000,
+        interval: float = 0.25,
+        window: int = 1200,  # ~5 minutes of samples at the default interval
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.samples: deque = deque(maxlen=window)
+        self.stalls = 0
+        self.last_stall: Optional[Dict[str, Any]] = None
+        self._beat = time.monotonic()
+        self._reported_beat: Optional[float] = None
+        self._culprit: Optional[str] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Starts monitoring the running loop; call from inside it."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop.set()
+
+    async def _heartbeat(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - started - self.interval)
+            self._beat = now
+            self.samples.append(lag)
+            if lag >= self.threshold:
+                culprit = self._culprit or "unknown (stall ended before it was sampled)"
+                self._culprit = None
+                self.stalls += 1
+                self.last_stall = {"lag": lag, "culprit": culprit, "at": time.time()}
+                logger.warning(f"Event loop lagged {lag * 1000:.0f} ms in {culprit}")
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            if beat == self._reported_beat:
+                continue
+            if time.monotonic() - beat < self.interval + self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._reported_beat = beat
+            self._culprit = _blocking_coroutine(frame)
+            stack = "".join(traceback.format_stack(frame)[-self.STACK_DEPTH :])
+            logger.warning(
+                f"Event loop blocked for over {self.threshold * 1000:.0f} ms "
+                f"in {self._culprit}:\n{stack}"
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        samples = list(self.samples)
+        return {
+            "p50": _percentile(samples, 50),
+            "p95": _percentile(samples, 95),
+            "p99": _percentile(samples, 99),
+            "max": max(samples, default=0.0),
+            "window": len(samples) * self.interval,
+            "stalls": self.stalls,
+            "last_stall": self.last_stall,
+        }
+
+
+# --- Bot Cog ---
+class SlskdCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.api = build_slskd_api()
+        # Every backend brings its own slots, so the global cap scales with them
+        self.downloads = DownloadQueueManager(
+            self.api, max_active=MAX_ACTIVE_DOWNLOADS * len(SLSKD_BACKEND_CONFIGS)
+        )
+        # Keys slskd reported as successfully downloaded on the last poll
+        self.downloaded_keys: set = set()
+        self.browse_cache = BrowseCache(self.api)
+        self.retention = TransferRetentionManager(self.api)
+        peer_reputation.load()
+        self.wishlist = Wishlist()
+        self.wishlist.load()
+        self.watchdog = LoopWatchdog()
+        self.watchdog.start()
+        self.download_monitor.start()
+        self.wishlist_scheduler.start()
+
+    def cog_unload(self):
+        self.download_monitor.cancel()
+        self.wishlist_scheduler.cancel()
+        self.watchdog.stop()
+        if peer_reputation.dirty:
+            peer_reputation.write(peer_reputation.snapshot())
+        if self.wishlist.dirty:
+            write_json_atomic(self.wishlist.path, self.wishlist.snapshot())
+        asyncio.create_task(self.api.close())
+        logger.info("SlskdCog unloaded, API session close scheduled.")
+    async def safe_send(
+        self,
+        ctx: commands.Context,
+        content: Optional[str] = None,
+        prefer_reply: bool = True,
+        **kwargs,
+    ):
+        """Send a message without relying on message history permissions.
+
+        Slash command responses are ephemeral unless ``ephemeral=False`` is
+        passed; prefix commands ignore the flag.
+        """
+        if content is None and "embed" not in kwargs and "view" not in kwargs:
+            raise ValueError("safe_send requires content or embed/view")
+        kwargs.setdefault("ephemeral", True)
+
+        if prefer_reply:
+            try:
+                return await ctx.reply(content, **kwargs)
+            except discord.Forbidden:
+                pass
+
+        try:
+            return await ctx.send(content, **kwargs)
+        except discord.Forbidden:
+            logger.warning(
+                "Missing permission to send messages in channel %s", ctx.channel
+            )
+            return None
+
+    async def _reject_if_degraded(self, ctx: commands.Context) -> bool:
+        """Tells the user slskd is down instead of waiting on a call that will fail."""
+        if not self.api.unavailable:
+            return False
+        await self.safe_send(ctx, SLSKD_DEGRADED_MESSAGE)
+        return True
+
+    def _failure_message(self, message: str) -> str:
+        return SLSKD_DEGRADED_MESSAGE if self.api.unavailable else message
+
+    async def trigger_navidrome_scan(self):
         """Triggers a library scan on the Navidrome server."""
         if not NAVIDROME_ADMIN_USER or not NAVIDROME_ADMIN_PASSWORD:
             logger.warning(
@@ -579,7 +2821,9 @@ class SlskdCog(commands.Cog):
         except Exception as e:
             logger.error(f"An error occurred while triggering Navidrome scan: {e}")
 
-    async def _handle_folder_progress(self, info: Dict[str, Any]):
+    async def _handle_folder_progress(
+        self, info: Dict[str, Any], failed_key: Optional[str] = None
+    ):
         folder_id = info.get("folder_id")
         if not folder_id:
             return
@@ -588,34 +2832,95 @@ class SlskdCog(commands.Cog):
         if not folder_state:
             return
 
-        folder_state["completed"] = folder_state.get("completed", 0) + 1
-        if folder_state["completed"] >= folder_state.get("total", 0):
+        if failed_key:
+            # Requesting the folder again re-enqueues just this file
+            folder_state["failed"] = folder_state.get("failed", 0) + 1
+            folder_state["keys"].discard(failed_key)
+        else:
+            folder_state["completed"] = folder_state.get("completed", 0) + 1
+        failures = folder_state.get("failed", 0)
+        if folder_state["completed"] + failures >= folder_state.get("total", 0):
+            summary = f"{folder_state['total']} files"
+            retry = ""
+            if failures:
+                summary += f", {failures} failed"
+                retry = " Use `!dl` on the folder again to retry the failed files."
             try:
-                user = await self.bot.fetch_user(folder_state["user_id"])
-                channel = await self.bot.fetch_channel(folder_state["channel_id"])
-                if user and channel:
-                    await channel.send(
-                        f"{user.mention} Folder `{folder_state['name']}` has finished downloading ({folder_state['total']} files)."
-                    )
+                await self._notify_subscribers(
+                    folder_state["subscribers"],
+                    f"Folder `{folder_state['name']}` has finished downloading ({summary}).{retry}",
+                )
             except Exception as e:
                 logger.error(f"Failed to send folder completion notice: {e}")
             finally:
                 folder_notifications.pop(folder_id, None)
 
-    @commands.command(name="search")
+    async def _give_up_on(self, failed_jobs: List[Dict[str, Any]]):
+        """Reports waiting files that ran out of enqueue attempts as failed."""
+        for job in failed_jobs:
+            if job["attempts"] < DownloadQueueManager.MAX_ENQUEUE_ATTEMPTS:
+                continue
+            logger.error(f"Giving up on enqueueing {job['key']}")
+            info = tracked_downloads.get(job["key"])
+            if info is not None and not info["notified"]:
+                await self._report_failed_download(job["key"], info, "could not enqueue")
+
+    async def _report_failed_download(self, key: str, info: Dict[str, Any], reason: str):
+        """Forgets a failed file so a later `!dl` enqueues it again, and says so."""
+        tracked_downloads.pop(key, None)
+        if info.get("folder_id") and info["folder_id"] in folder_notifications:
+            # The folder's summary reports failures, rather than one ping per file
+            await self._handle_folder_progress(info, failed_key=key)
+            return
+        try:
+            await self._notify_subscribers(
+                info["subscribers"],
+                f"❌ Download failed ({reason}): `{info['filename']}`. "
+                "Use `!dl` to try again.",
+            )
+        except Exception as e:
+            logger.error(f"Failed to send download failure notice: {e}")
+        await self._handle_folder_progress(info, failed_key=key)
+
+    async def _notify_subscribers(self, subscribers: List[Dict[str, Any]], text: str):
+        """Sends one message per channel, mentioning every subscriber in it."""
+        by_channel: Dict[int, List[int]] = {}
+        for sub in subscribers:
+            by_channel.setdefault(sub["channel_id"], []).append(sub["user_id"])
+        for channel_id, user_ids in by_channel.items():
+            # One deleted or forbidden channel must not stop the others
+            try:
+                channel = self.bot.get_channel(
+                    channel_id
+                ) or await self.bot.fetch_channel(channel_id)
+                if channel:
+                    mentions = " ".join(f"<@{user_id}>" for user_id in user_ids)
+                    await channel.send(f"{mentions} {text}")
+            except Exception as e:
+                logger.warning(f"Could not notify channel {channel_id}: {e}")
+
+    @commands.hybrid_command(name="search")
+    @app_commands.describe(query="What to search Soulseek for")
     async def search(self, ctx: commands.Context, *, query: str):
         """Searches slskd for a query.
         Example: !search <your search query>
         """
+        # Acknowledge slash invocations now; polling outlives the 3s window.
+        await ctx.defer(ephemeral=True)
+        if await self._reject_if_degraded(ctx):
+            return
         logger.info(f"User {ctx.author} starting search for: {query}")
         msg = await ctx.send(
-            f"🔍 Starting search for `{query}`... this may take a moment."
+            f"🔍 Starting search for `{query}`... this may take a moment.",
+            ephemeral=True,
         )
 
         search_id = await self.api.start_search(query)
         if not search_id:
             await msg.edit(
-                content=f"Sorry, I failed to start the search on slskd. Check my logs."
+                content=self._failure_message(
+                    "Sorry, I failed to start the search on slskd. Check my logs."
+                )
             )
             return
 
@@ -624,19 +2929,26 @@ class SlskdCog(commands.Cog):
             await asyncio.sleep(1)
             status = await self.api.get_search_state(search_id)
             if status is None:
-                await msg.edit(content=f"Error checking search status for `{query}`.")
+                await msg.edit(
+                    content=self._failure_message(
+                        f"Error checking search status for `{query}`."
+                    )
+                )
                 return
 
             responses = await self.api.get_search_results(search_id) or []
             total_files = sum(len(r.get("files", [])) for r in responses)
 
             if total_files and paginator is None:
-                paginator = SearchResultPaginator(ctx, responses, query)
+                processed = await process_search_responses(responses)
+                paginator = SearchResultPaginator(
+                    ctx, responses, query, rows=processed[0] if processed else None
+                )
                 paginator.message = await msg.edit(
                     content=None, embed=paginator.get_page_embed(), view=paginator
                 )
                 msg = paginator.message
-            elif paginator and paginator.refresh_results(responses) and paginator.message:
+            elif paginator and await paginator.refresh_results(responses) and paginator.message:
                 await paginator.push_update()
 
             if status.get("isComplete"):
@@ -647,21 +2959,34 @@ class SlskdCog(commands.Cog):
         else:
             await paginator.push_update()
 
-    @commands.command(name="dl", aliases=["download"])
-    async def download(self, ctx: commands.Context, number: int):
+    @commands.hybrid_command(name="dl", aliases=["download"])
+    @app_commands.describe(selection="Result number, or start typing a name")
+    async def download(self, ctx: commands.Context, *, selection: str):
         """Downloads a file or folder from your last search.
         Example: !dl 5
         """
+        await ctx.defer(ephemeral=True)
         if ctx.author.id not in user_search_results:
             await self.safe_send(
                 ctx, "You don't have any active search results. Please use `!search` first."
             )
             return
 
+        if await self._reject_if_degraded(ctx):
+            return
+
         results = user_search_results[ctx.author.id]
 
-        # Adjust for 1-based indexing
-        index = number - 1
+        # Numbers are 1-based; anything else is matched by name prefix
+        index = resolve_selection(ctx.author.id, selection)
+
+        if index is None:
+            await self.safe_send(
+                ctx,
+                f"No single result matches `{selection}`. "
+                f"Please pick a number between 1 and {len(results)}.",
+            )
+            return
 
         if not (0 <= index < len(results)):
             await self.safe_send(
@@ -686,112 +3011,457 @@ class SlskdCog(commands.Cog):
                 ctx, f"An error occurred while trying to queue the download: {e}"
             )
 
-    async def _queue_single_file(self, ctx: commands.Context, item: Dict[str, Any]):
-        file_payload = dict(item["file"])
-        file_payload["token"] = item["token"]
-        success = await self.api.enqueue_files(item["username"], [file_payload])
-        if not success:
-            await self.safe_send(ctx, "Failed to queue download. Please try again.")
-            return
+    @download.autocomplete("selection")
+    async def download_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> List[app_commands.Choice[str]]:
+        """Suggests results from the caller's cached search via the prefix index."""
+        index = get_user_prefix_index(interaction.user.id)
+        if index is None:
+            return []
+
+        results = index.source
+        current = current.strip()
+        positions: List[int] = []
+        if not current:
+            positions = list(range(min(len(results), AUTOCOMPLETE_LIMIT)))
+        else:
+            if current.isdigit() and 0 < int(current) <= len(results):
+                positions.append(int(current) - 1)
+            positions.extend(p for p in index.lookup(current) if p not in positions)
+
+        choices = []
+        for position in positions[:AUTOCOMPLETE_LIMIT]:
+            item = results[position]
+            icon = "📁" if item.get("type") == "folder" else "🎵"
+            name = item.get("display_name") or display_filename(item.get("path"))
+            label = f"{position + 1}. {icon} {name} ({item.get('username')})"
+            choices.append(app_commands.Choice(name=label[:100], value=str(position + 1)))
+        return choices
+
+    async def _submit_downloads(
+        self, ctx: commands.Context, item: Dict[str, Any], payload: List[Dict[str, Any]]
+    ) -> Optional[int]:
+        """Hands files to the download queue and releases whatever fits now.
+
+        Returns how many files are still waiting for a slot, or None when
+        slskd rejected the files that were released.
+        """
+        jobs = self.downloads.submit(
+            ctx.author.id,
+            item["username"],
+            payload,
+            speed_hint=item.get("speed_kb", 0) * 1024,
+        )
+        failed = await self.downloads.dispatch()
+        failed_ids = {id(job) for job in failed}
+        own_ids = {id(job) for job in jobs}
+        await self._give_up_on([job for job in failed if id(job) not in own_ids])
+        if any(id(job) in failed_ids for job in jobs):
+            self.downloads.cancel(jobs)
+            return None
+        return sum(1 for job in jobs if self.downloads.in_flight.get(job["key"]) is not job)
 
+    async def _queue_single_file(self, ctx: commands.Context, item: Dict[str, Any]) -> bool:
+        """Queues one file result; returns False if it could not be queued."""
         filename = display_filename(item["path"])
-        await self.safe_send(ctx, f"✅ Queued for download: `{filename}`")
-
         transfer_key = make_transfer_key(item["username"], item["path"])
+        existing = tracked_downloads.get(transfer_key)
+        if (existing and existing["notified"]) or (
+            existing is None and transfer_key in self.downloaded_keys
+        ):
+            await self.safe_send(ctx, f"✅ `{filename}` has already been downloaded.")
+            return True
+        if existing is not None:
+            # Someone already asked for this file; ride along instead of re-enqueueing
+            if add_subscriber(existing, ctx.author.id, ctx.channel.id):
+                await self.safe_send(
+                    ctx,
+                    f"🔗 `{filename}` is already downloading. You'll be notified when it completes.",
+                )
+            else:
+                await self.safe_send(ctx, f"You're already waiting on `{filename}`.")
+            return True
+
+        # Reserve the key before awaiting so concurrent requests attach to it
         tracked_downloads[transfer_key] = {
-            "user_id": ctx.author.id,
-            "channel_id": ctx.channel.id,
             "filename": filename,
             "notified": False,
             "search_path": item["path"],
+            "subscribers": [{"user_id": ctx.author.id, "channel_id": ctx.channel.id}],
         }
 
-    async def _queue_folder(self, ctx: commands.Context, item: Dict[str, Any]):
+        file_payload = dict(item["file"])
+        file_payload["token"] = item["token"]
+        waiting = await self._submit_downloads(ctx, item, [file_payload])
+        if waiting is None:
+            info = tracked_downloads.get(transfer_key)
+            if info is not None:
+                remove_subscriber(info, ctx.author.id)
+                if not info["subscribers"]:
+                    del tracked_downloads[transfer_key]
+            await self.safe_send(
+                ctx, self._failure_message("Failed to queue download. Please try again.")
+            )
+            return False
+
+        if waiting:
+            await self.safe_send(
+                ctx, f"⏳ Waiting for a free download slot: `{filename}` (starts automatically)"
+            )
+        else:
+            await self.safe_send(ctx, f"✅ Queued for download: `{filename}`")
+        return True
+
+    async def _queue_folder(self, ctx: commands.Context, item: Dict[str, Any]) -> bool:
+        """Queues every file of a folder result; returns False if that failed."""
         folder_files = item.get("files", [])
         if not folder_files:
             await self.safe_send(ctx, "No files found in that folder result.")
-            return
+            return False
 
+        folder_name = item.get("display_name") or display_filename(item.get("path"))
+        folder_id = make_folder_id(item["username"], item.get("path"))
+        folder_state = folder_notifications.setdefault(
+            folder_id,
+            {"name": folder_name, "total": 0, "completed": 0, "subscribers": [], "keys": set()},
+        )
+        add_subscriber(folder_state, ctx.author.id, ctx.channel.id)
+
+        # Enqueue only files nobody has asked for yet; subscribe to the rest
         payload = []
+        reserved: List[str] = []
+        attached: List[Dict[str, Any]] = []
+        shared = 0
         for file_info in folder_files:
-            file_payload = dict(file_info)
-            file_payload["token"] = item["token"]
-            payload.append(file_payload)
+            filename = file_info.get("filename")
+            key = make_transfer_key(item["username"], filename)
+            info = tracked_downloads.get(key)
+            if key in folder_state["keys"]:
+                shared += 1
+                if info is not None and add_subscriber(info, ctx.author.id, ctx.channel.id):
+                    attached.append(info)
+                continue
+
+            folder_state["keys"].add(key)
+            folder_state["total"] += 1
+            if info is None and key in self.downloaded_keys:
+                folder_state["completed"] += 1
+                shared += 1
+                continue
+
+            if info is None:
+                info = tracked_downloads[key] = {
+                    "filename": display_filename(filename),
+                    "notified": False,
+                    "search_path": filename,
+                    "folder_id": folder_id,
+                    "subscribers": [],
+                }
+                file_payload = dict(file_info)
+                file_payload["token"] = item["token"]
+                payload.append(file_payload)
+                reserved.append(key)
+            else:
+                shared += 1
+                info.setdefault("folder_id", folder_id)
+                if info["notified"]:
+                    folder_state["completed"] += 1
+            if add_subscriber(info, ctx.author.id, ctx.channel.id):
+                attached.append(info)
+
+        waiting = 0
+        if payload:
+            waiting = await self._submit_downloads(ctx, item, payload)
+            if waiting is None:
+                for key in reserved:
+                    tracked_downloads.pop(key, None)
+                    folder_state["keys"].discard(key)
+                folder_state["total"] -= len(reserved)
+                for info in attached:
+                    remove_subscriber(info, ctx.author.id)
+                remove_subscriber(folder_state, ctx.author.id)
+                if not folder_state["subscribers"]:
+                    folder_notifications.pop(folder_id, None)
+                await self.safe_send(
+                    ctx,
+                    self._failure_message("Failed to queue folder download. Please try again."),
+                )
+                return False
 
-        success = await self.api.enqueue_files(item["username"], payload)
-        if not success:
-            await self.safe_send(ctx, "Failed to queue folder download. Please try again.")
+        if folder_state["completed"] >= folder_state["total"]:
+            folder_notifications.pop(folder_id, None)
+            await self.safe_send(ctx, f"✅ Folder `{folder_name}` has already been downloaded.")
+            return True
+        if not payload:
+            await self.safe_send(
+                ctx,
+                f"🔗 Folder `{folder_name}` is already downloading. "
+                "You'll be notified when it finishes.",
+            )
+            return True
+
+        message = f"📁 Queued folder `{folder_name}` with {len(payload)} files."
+        if shared:
+            message += f" {shared} more were already downloading or downloaded."
+        if waiting:
+            message += f" {waiting} will start as download slots free up."
+        await self.safe_send(ctx, message)
+        return True
+
+    @commands.hybrid_command(name="filter")
+    @app_commands.describe(
+        criteria="e.g. ext:flac bitrate:320 size:10-500 free user:<name> type:folder words"
+    )
+    async def filter_results(self, ctx: commands.Context, *, criteria: str = ""):
+        """Narrows your current search results.
+        Example: !filter ext:flac bitrate:320 size:10-500 free
+        """
+        await ctx.defer(ephemeral=True)
+        paginator = user_paginators.get(ctx.author.id)
+        if paginator is None:
+            await self.safe_send(
+                ctx, "You don't have any active search results. Please use `!search` first."
+            )
             return
 
-        folder_name = item.get("display_name") or display_filename(item.get("path"))
+        if criteria.strip().lower() in ("", "clear", "reset", "none"):
+            spec: Dict[str, Any] = {}
+        else:
+            try:
+                spec = parse_filter_args(criteria)
+            except ValueError as e:
+                await self.safe_send(ctx, f"{e} See `!help` for the filter syntax.")
+                return
+
+        if spec:
+            await paginator.prepare_table()
+        paginator.set_filters(spec)
+        await paginator.push_update()
+        summary = describe_filter(spec) or "none"
         await self.safe_send(
             ctx,
-            f"📁 Queued folder `{folder_name}` with {len(folder_files)} files.",
+            f"Showing {len(paginator.view_results)} of {len(paginator.all_results)} "
+            f"results (filter: {summary}).",
         )
 
-        folder_id = make_folder_id(item["username"], item.get("path"))
-        folder_notifications[folder_id] = {
-            "user_id": ctx.author.id,
-            "channel_id": ctx.channel.id,
-            "name": folder_name,
-            "total": len(folder_files),
-            "completed": 0,
-        }
+    @commands.hybrid_command(name="sort")
+    @app_commands.describe(
+        field="size, bitrate, speed, reliable, user, name or default",
+        direction="asc or desc",
+    )
+    async def sort_results(
+        self, ctx: commands.Context, field: str = "default", direction: str = ""
+    ):
+        """Re-orders your current search results.
+        Example: !sort bitrate desc
+        """
+        await ctx.defer(ephemeral=True)
+        paginator = user_paginators.get(ctx.author.id)
+        if paginator is None:
+            await self.safe_send(
+                ctx, "You don't have any active search results. Please use `!search` first."
+            )
+            return
 
-        for file_info in folder_files:
-            filename = file_info.get("filename")
-            key = make_transfer_key(item["username"], filename)
-            tracked_downloads[key] = {
-                "user_id": ctx.author.id,
-                "channel_id": ctx.channel.id,
-                "filename": display_filename(filename),
-                "notified": False,
-                "search_path": filename,
-                "folder_id": folder_id,
-            }
+        field = field.lower()
+        direction = direction.lower()
+        if field in ("default", "none", "clear"):
+            paginator.set_sort(None)
+            await paginator.push_update()
+            await self.safe_send(ctx, "Restored the default result order.")
+            return
+        if field not in SORT_FIELDS or direction not in ("", "asc", "desc"):
+            await self.safe_send(
+                ctx,
+                "Usage: `!sort <size|bitrate|speed|reliable|user|name|default> [asc|desc]`.",
+            )
+            return
+
+        descending = SORT_FIELDS[field] if not direction else direction == "desc"
+        await paginator.prepare_table()
+        paginator.set_sort(field, descending)
+        await paginator.push_update()
+        await self.safe_send(
+            ctx, f"Sorted by {field} ({'desc' if descending else 'asc'})."
+        )
+
+    @commands.hybrid_command(name="browse")
+    @app_commands.describe(
+        target="Peer username, or a result number to open that result's folder",
+        path="Folder inside the peer's share (blank for the top level)",
+    )
+    async def browse(self, ctx: commands.Context, target: str, *, path: str = ""):
+        """Lists the folders and files a peer is sharing.
+        Example: !browse someuser @@someuser\\Music
+        """
+        await ctx.defer(ephemeral=True)
+        if await self._reject_if_degraded(ctx):
+            return
+
+        peer = target
+        results = user_search_results.get(ctx.author.id)
+        if target.isdigit() and not path and results:
+            index = int(target) - 1
+            if not (0 <= index < len(results)):
+                await self.safe_send(
+                    ctx,
+                    f"Invalid number. Please pick a number between 1 and {len(results)}.",
+                )
+                return
+            item = results[index]
+            peer = item["username"]
+            path = item.get("path") if item["type"] == "folder" else _dirname(item.get("path"))
+
+        path = _normalize_path(path.strip())
+        trie = await self.browse_cache.share(peer)
+        if trie is None:
+            await self.safe_send(
+                ctx,
+                self._failure_message(f"Couldn't browse `{peer}`. They may be offline."),
+            )
+            return
+
+        rows = browse_rows(peer, trie, path)
+        if rows is None:
+            await self.safe_send(ctx, f"`{path}` isn't in {peer}'s share.")
+            return
+        if not rows:
+            await self.safe_send(ctx, "That folder is empty.")
+            return
+
+        location = path.replace("/", "\\") or "/"
+        paginator = SearchResultPaginator(
+            ctx, [], path, rows=rows, title=f"Browsing {peer}: {location}"
+        )
+        message = await self.safe_send(
+            ctx,
+            embed=paginator.get_page_embed(),
+            view=paginator,
+            prefer_reply=False,
+        )
+        if message is not None:
+            paginator.message = message
+        else:
+            paginator.stop()
+
+    @commands.hybrid_command(name="expand")
+    @app_commands.describe(number="Number of the folder result to complete")
+    async def expand(self, ctx: commands.Context, number: int):
+        """Loads every file in a folder result, not just the ones that matched.
+        Example: !expand 3
+        """
+        await ctx.defer(ephemeral=True)
+        paginator = user_paginators.get(ctx.author.id)
+        if paginator is None:
+            await self.safe_send(
+                ctx, "You don't have any active search results. Please use `!search` first."
+            )
+            return
+        if await self._reject_if_degraded(ctx):
+            return
+
+        results = paginator.view_results
+        index = number - 1
+        if not (0 <= index < len(results)):
+            await self.safe_send(
+                ctx,
+                f"Invalid number. Please pick a number between 1 and {len(results)}.",
+            )
+            return
+
+        item = results[index]
+        folder_name = item.get("display_name") or display_filename(item.get("path"))
+        if item["type"] != "folder":
+            await self.safe_send(ctx, "Only folder results can be expanded.")
+            return
+        if item.get("expanded"):
+            await self.safe_send(ctx, f"`{folder_name}` already lists every file.")
+            return
+
+        matched = item.get("file_count", 0)
+        files = await self.browse_cache.directory(item["username"], item.get("path", ""))
+        if files is None:
+            await self.safe_send(
+                ctx,
+                self._failure_message(
+                    f"Couldn't list `{folder_name}`. The peer may be offline."
+                ),
+            )
+            return
+
+        await paginator.expand_folder(item, files)
+        await paginator.push_update()
+        position = next(
+            (i for i, row in enumerate(paginator.view_results) if row is item), None
+        )
+        where = (
+            f"Use `!dl {position + 1}` to download the whole folder."
+            if position is not None
+            else "It no longer matches your filter; use `!filter` to clear it."
+        )
+        await self.safe_send(
+            ctx,
+            f"📁 `{folder_name}` has {len(files)} files ({matched} matched your search). {where}",
+        )
 
-    @commands.command(name="progress", aliases=["status"])
+    @commands.hybrid_command(name="progress", aliases=["status"])
     async def progress(self, ctx: commands.Context):
         """Shows the status of your ongoing slskd downloads."""
-        transfers = await self.api.get_all_downloads()
+        await ctx.defer(ephemeral=True)
+        if await self._reject_if_degraded(ctx):
+            return
+        transfers = await self.api.get_all_downloads(
+            include_removed=not self.retention.enabled
+        )
         if transfers is None:
             await self.safe_send(
-                ctx, "Could not retrieve download status or no active transfers."
+                ctx,
+                self._failure_message(
+                    "Could not retrieve download status or no active transfers."
+                ),
             )
             return
-        if not transfers:
-            await self.safe_send(ctx, "No active downloads found.")
-            return
 
         entries = []
-        for transfer in transfers:
-            username = transfer.get("username")
-            for directory in transfer.get("directories", []):
-                for file_info in directory.get("files", []):
-                    if file_info.get("direction") != "Download":
-                        continue
+        for file_info in transfers:
+            username = file_info["username"]
+            state = file_info.get("state") or "Unknown"
+            filename = display_filename(file_info.get("filename"))
+            percent = file_info.get("percentComplete", 0) or 0
+            bar = "🟩" * int(percent / 10) + "⬜" * (10 - int(percent / 10))
+            timestamp = (
+                file_info.get("requestedAt")
+                or file_info.get("enqueuedAt")
+                or file_info.get("startedAt")
+                or ""
+            )
+            entries.append(
+                {
+                    "username": username,
+                    "filename": filename,
+                    "state": state,
+                    "bar": bar,
+                    "percent": percent,
+                    "timestamp": timestamp,
+                    "description": f"**{filename}** (from {username})\n`{state}` | {bar} | `{percent:.1f}%`",
+                }
+            )
 
-                    state = file_info.get("state", "Unknown")
-                    filename = display_filename(file_info.get("filename"))
-                    percent = file_info.get("percentComplete", 0) or 0
-                    bar = "🟩" * int(percent / 10) + "⬜" * (10 - int(percent / 10))
-                    timestamp = (
-                        file_info.get("requestedAt")
-                        or file_info.get("enqueuedAt")
-                        or file_info.get("startedAt")
-                        or ""
-                    )
-                    entries.append(
-                        {
-                            "username": username,
-                            "filename": filename,
-                            "state": state,
-                            "bar": bar,
-                            "percent": percent,
-                            "timestamp": timestamp,
-                            "description": f"**{filename}** (from {username})\n`{state}` | {bar} | `{percent:.1f}%`",
-                        }
-                    )
+        # Files the bot is still holding back for a free slot
+        for job in self.downloads.pending_jobs():
+            filename = display_filename(job["payload"].get("filename"))
+            entries.append(
+                {
+                    "username": job["peer"],
+                    "filename": filename,
+                    "state": "Waiting for slot",
+                    "bar": "⬜" * 10,
+                    "percent": 0,
+                    "timestamp": "",
+                    "description": f"**{filename}** (from {job['peer']})\n`Waiting for slot` | {'⬜' * 10} | `0.0%`",
+                }
+            )
 
         if not entries:
             await self.safe_send(ctx, "No active downloads found.")
@@ -811,13 +3481,174 @@ class SlskdCog(commands.Cog):
         else:
             paginator.stop()
 
-    @commands.command(name="help", aliases=["commands", "?"], help="Show bot commands")
+    @commands.hybrid_command(name="wish")
+    @app_commands.describe(
+        request="A query to keep searching for; `auto <query>`, `show <n>`, `remove <n>`, or empty to list"
+    )
+    async def wish(self, ctx: commands.Context, *, request: str = ""):
+        """Keeps searching for something in the background.
+        Example: !wish aphex twin selected ambient works
+        """
+        await ctx.defer(ephemeral=True)
+        action, _, rest = request.strip().partition(" ")
+        action = action.lower()
+        rest = rest.strip()
+        mine = self.wishlist.for_user(ctx.author.id)
+        # Only a bare number makes a subcommand; `!wish show me the money` is a query
+        numbered = rest.lstrip("-").isdigit()
+
+        if action in ("", "list") and not rest:
+            if not mine:
+                await self.safe_send(ctx, "You have no wishes. Add one with `!wish <query>`.")
+                return
+            lines = []
+            for number, (_, wish) in enumerate(mine, start=1):
+                auto = any(
+                    sub["user_id"] == ctx.author.id and sub.get("auto")
+                    for sub in wish["subscribers"]
+                )
+                searched = (
+                    f"searched {int((time.time() - wish['last_searched']) / 60)}m ago"
+                    if wish["last_searched"]
+                    else "not searched yet"
+                )
+                lines.append(
+                    f"**{number}.** `{wish['query']}` – {wish['hits']} found, {searched}"
+                    + (" · auto-download" if auto else "")
+                )
+            embed = discord.Embed(
+                title="Your Wishes", description="\n".join(lines), color=discord.Color.gold()
+            )
+            await self.safe_send(ctx, embed=embed)
+            return
+
+        if action in ("remove", "rm", "delete", "show") and numbered:
+            number = int(rest)
+            if not 1 <= number <= len(mine):
+                await self.safe_send(ctx, f"Usage: `!wish {action} <number>` (see `!wish`).")
+                return
+            key, wish = mine[number - 1]
+            if action != "show":
+                self.wishlist.remove(key, ctx.author.id)
+                await self._save_wishlist()
+                await self.safe_send(ctx, f"🗑️ Removed your wish for `{wish['query']}`.")
+                return
+            rows = self.wishlist.latest.get(key)
+            if not rows:
+                await self.safe_send(
+                    ctx, f"No new matches for `{wish['query']}` since I started. Try `!search` instead."
+                )
+                return
+            paginator = SearchResultPaginator(
+                ctx, [], wish["query"], rows=list(rows), title=f"Wish: {wish['query']}"
+            )
+            message = await self.safe_send(
+                ctx,
+                embed=paginator.get_page_embed(),
+                view=paginator,
+                prefer_reply=False,
+            )
+            if message is not None:
+                paginator.message = message
+            else:
+                paginator.stop()
+            return
+
+        auto = action == "auto"
+        query = rest if auto else request.strip()
+        if not query:
+            await self.safe_send(ctx, "Usage: `!wish [auto] <query>`.")
+            return
+        try:
+            key, created = self.wishlist.add(query, ctx.author.id, ctx.channel.id, auto)
+        except ValueError as e:
+            await self.safe_send(ctx, str(e))
+            return
+        await self._save_wishlist()
+        shared = "" if created else " Others wished for it too, so you'll share the search."
+        then = "download the best match" if auto else "let you know"
+        await self.safe_send(
+            ctx,
+            f"🌠 Wish saved: `{self.wishlist.wishes[key]['query']}`. I'll keep searching "
+            f"in the background and {then} when it turns up.{shared}",
+        )
+
+    @commands.hybrid_command(name="diag")
+    @commands.check_any(
+        commands.is_owner(), commands.has_guild_permissions(administrator=True)
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def diag(self, ctx: commands.Context):
+        """Shows event-loop lag and internal queue sizes (admins only)."""
+        stats = self.watchdog.summary()
+        embed = discord.Embed(title="Bot Diagnostics", color=discord.Color.dark_grey())
+        embed.add_field(
+            name=f"Event-loop lag (last {stats['window'] / 60:.0f} min)",
+            value=(
+                f"p50 `{stats['p50'] * 1000:.1f} ms` · p95 `{stats['p95'] * 1000:.1f} ms` · "
+                f"p99 `{stats['p99'] * 1000:.1f} ms` · max `{stats['max'] * 1000:.1f} ms`\n"
+                f"Stalls over {self.watchdog.threshold * 1000:.0f} ms since start: {stats['stalls']}"
+            ),
+            inline=False,
+        )
+        last = stats["last_stall"]
+        if last:
+            ago = int(time.time() - last["at"])
+            embed.add_field(
+                name="Last stall",
+                value=f"`{last['lag'] * 1000:.0f} ms` in `{last['culprit']}`, {ago}s ago",
+                inline=False,
+            )
+        embed.add_field(
+            name="Downloads",
+            value=(
+                f"Tracked: {len(tracked_downloads)} · Folders: {len(folder_notifications)}\n"
+                f"Waiting in bot: {self.downloads.pending_count()} · "
+                f"Handed to slskd: {len(self.downloads.in_flight)}"
+            ),
+            inline=False,
+        )
+        if isinstance(self.api, SlskdBackendPool):
+            slskd_status = "\n".join(
+                f"{'⚠️' if client.unavailable else '✅'} {name}: {self.api.load[name]} active"
+                for name, client in self.api.clients.items()
+            )
+        else:
+            slskd_status = (
+                "⚠️ failing fast (circuit open)" if self.api.unavailable else "✅ reachable"
+            )
+        embed.add_field(name="slskd", value=slskd_status, inline=True)
+        embed.add_field(
+            name="Caches",
+            value=(
+                f"Result sets: {len(user_search_results)}\n"
+                f"Peers with history: {len(peer_reputation.peers)}\n"
+                f"Wishes: {len(self.wishlist.wishes)}"
+            ),
+            inline=True,
+        )
+        embed.add_field(
+            name="Pruned transfers",
+            value=str(self.retention.removed_total) if self.retention.enabled else "off",
+            inline=True,
+        )
+        await self.safe_send(ctx, embed=embed)
+
+    @commands.hybrid_command(name="help", aliases=["commands", "?"], help="Show bot commands")
     async def help_command(self, ctx: commands.Context):
         """Lists the available bot commands."""
         description = (
             "`!search <query>` – run a Soulseek search.\n"
-            "`!dl <number>` – queue the indexed result from your latest search.\n"
-            "`!progress` / `!status` – show download progress."
+            "`!dl <number|name>` – queue the indexed result from your latest search.\n"
+            "`!filter <criteria>` – narrow results, e.g. `ext:flac bitrate:320 size:10-500 free user:<name> type:folder <words>`; `!filter` alone clears.\n"
+            "`!sort <size|bitrate|speed|reliable|user|name|default> [asc|desc]` – re-order results.\n"
+            "`!expand <number>` – load every file in a folder result, not just the matches.\n"
+            "`!browse <user|number> [path]` – list a peer's shared folders.\n"
+            "`!progress` / `!status` – show download progress.\n"
+            "`!wish <query>` – keep searching in the background and tell you when it turns up; "
+            "`!wish auto <query>` downloads the best match, `!wish` lists, `!wish show|remove <number>`.\n"
+            "`!diag` – event-loop lag and queue stats (admins).\n"
+            "All commands are also available as `/` slash commands."
         )
         embed = discord.Embed(
             title="Available Commands", description=description, color=discord.Color.blurple()
@@ -829,37 +3660,65 @@ class SlskdCog(commands.Cog):
         """Periodically checks for completed downloads and notifies users."""
         await self.bot.wait_until_ready()
 
-        if not tracked_downloads:
+        if (
+            not tracked_downloads
+            and not self.downloads.has_work()
+            and not self.retention.sweep_due()
+        ):
             return  # No downloads to track
 
         try:
-            transfers = await self.api.get_all_downloads()
+            transfers = await self.api.get_all_downloads(
+                include_removed=not self.retention.enabled
+            )
             if transfers is None:
                 return
 
             active_transfers: Dict[str, str] = {}
-            completed_transfers = set()
-
-            for transfer in transfers:
-                username = transfer.get("username")
-                for directory in transfer.get("directories", []):
-                    for file_info in directory.get("files", []):
-                        if file_info.get("direction") != "Download":
-                            continue
-
-                        key = make_transfer_key(username, file_info.get("filename"))
-                        state = (file_info.get("state") or "").lower()
-                        percent = file_info.get("percentComplete", 0) or 0
-                        bytes_remaining = file_info.get("bytesRemaining")
+            succeeded_transfers = set()
+            # { key: state } for transfers that ended without succeeding
+            failed_transfers: Dict[str, str] = {}
+            queue_states: Dict[str, Dict[str, Any]] = {}
+            queue_ranks: Dict[str, int] = {}  # Same precedence as the sets above
+
+            for file_info in transfers:
+                key = make_transfer_key(file_info["username"], file_info.get("filename"))
+                state = (file_info.get("state") or "").lower()
+                percent = file_info.get("percentComplete", 0) or 0
+                bytes_remaining = file_info.get("bytesRemaining")
+
+                is_complete = state.startswith("completed") or state == "succeeded"
+                succeeded = "succeeded" in state
+                if not is_complete and bytes_remaining == 0 and percent >= 99.9:
+                    is_complete = succeeded = True
+
+                # A retried file can be listed twice; success beats running beats failure
+                if succeeded:
+                    succeeded_transfers.add(key)
+                elif not is_complete:
+                    active_transfers[key] = state
+                else:
+                    failed_transfers[key] = file_info.get("state") or "failed"
+                rank = 2 if succeeded else 0 if is_complete else 1
+                if rank >= queue_ranks.get(key, -1):
+                    queue_ranks[key] = rank
+                    queue_states[key] = {
+                        "complete": is_complete,
+                        "speed": file_info.get("averageSpeed") or 0.0,
+                        "remote_queued": "remotely" in state,
+                    }
 
-                        is_complete = state.startswith("completed") or state == "succeeded"
-                        if bytes_remaining == 0 and percent >= 99.9:
-                            is_complete = True
+            # Accumulate: pruned transfers disappear from later polls
+            self.downloaded_keys.update(succeeded_transfers)
+            peer_reputation.observe(transfers)
+            if peer_reputation.save_due():
+                await asyncio.to_thread(peer_reputation.write, peer_reputation.snapshot())
+                peer_reputation.mark_saved()
 
-                        if is_complete:
-                            completed_transfers.add(key)
-                        else:
-                            active_transfers[key] = state
+            # Free slots held by finished transfers, then release waiting files
+            self.downloads.observe(queue_states)
+            await self._give_up_on(await self.downloads.dispatch())
+            queued_keys = self.downloads.queued_keys()
 
             # --- Modified Logic ---
             # We set a flag to only scan ONCE per loop, even if multiple files finish
@@ -867,35 +3726,34 @@ class SlskdCog(commands.Cog):
 
             # Now check our tracked downloads
             for key, info in list(tracked_downloads.items()):
-                if key in completed_transfers and not info["notified"]:
-                    # This download finished! Notify the user.
+                if key in succeeded_transfers and not info["notified"]:
+                    # This download finished! Notify everyone who asked for it.
+                    # Mark as notified first so a failed send never repeats the notice
+                    tracked_downloads[key]["notified"] = True
+                    needs_navidrome_scan = True  # Set the flag
                     try:
-                        user = await self.bot.fetch_user(info["user_id"])
-                        channel = await self.bot.fetch_channel(info["channel_id"])
-
-                        if user and channel:
-                            await channel.send(
-                                f"{user.mention} Your download is complete: `{info['filename']}`"
-                            )
-
-                        # Mark as notified to avoid repeat messages
-                        tracked_downloads[key]["notified"] = True
-                        await self._handle_folder_progress(info)
-                        needs_navidrome_scan = True  # Set the flag
-
-                        # Optional: Remove from tracking after a while
-                        # For now, we'll just leave it as notified
-
-                    except discord.NotFound:
-                        logger.warning(
-                            f"Could not find user/channel for completed download: {key}"
+                        await self._notify_subscribers(
+                            info["subscribers"],
+                            f"Your download is complete: `{info['filename']}`",
                         )
                     except Exception as e:
                         logger.error(f"Failed to send download completion notice: {e}")
+                    await self._handle_folder_progress(info)
+
+                elif (
+                    key in failed_transfers
+                    and key not in active_transfers
+                    and key not in queued_keys
+                    and not info["notified"]
+                ):
+                    # Forget it so a later `!dl` enqueues the file again
+                    await self._report_failed_download(key, info, failed_transfers[key])
 
                 elif (
                     key not in active_transfers
-                    and key not in completed_transfers
+                    and key not in succeeded_transfers
+                    and key not in failed_transfers
+                    and key not in queued_keys
                     and not info["notified"]
                 ):
                     # Transfer is no longer in the list, it was probably cleared or failed
@@ -907,14 +3765,120 @@ class SlskdCog(commands.Cog):
             if needs_navidrome_scan:
                 await self.trigger_navidrome_scan()
 
+            # Drop finished transfers from slskd once they are past retention
+            if self.retention.enabled:
+                due = self.retention.candidates(transfers, tracked_downloads)
+                for key in await self.retention.prune(due):
+                    info = tracked_downloads.get(key)
+                    if info is not None and info["notified"]:
+                        del tracked_downloads[key]
+
         except Exception as e:
             logger.error(f"Error in download_monitor task: {e}")
 
+    async def _save_wishlist(self):
+        await asyncio.to_thread(write_json_atomic, self.wishlist.path, self.wishlist.snapshot())
+        self.wishlist.dirty = False
+
+    async def _wish_search(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Runs one background search to completion; None if slskd failed."""
+        search_id = await self.api.start_search(query)
+        if not search_id:
+            return None
+        for _ in range(15):  # give the network ~30 seconds to answer
+            await asyncio.sleep(2)
+            status = await self.api.get_search_state(search_id)
+            if status is None:
+                return None
+            if status.get("isComplete"):
+                break
+        responses = await self.api.get_search_results(search_id)
+        if responses is None:
+            return None
+        processed = await process_search_responses(responses)
+        return processed[0] if processed else []
+
+    async def _run_wish(self, key: str):
+        wish = self.wishlist.wishes.get(key)
+        if wish is None:
+            return
+        rows = await self._wish_search(wish["query"])
+        self.wishlist.mark_searched(key)
+        if rows is None:
+            return
+        new_rows = self.wishlist.evaluate(key, rows)
+        if not new_rows or key not in self.wishlist.wishes:
+            return
+
+        best = self.wishlist.latest[key][0]
+        logger.info(f"Wish '{wish['query']}' found {len(new_rows)} new results")
+        # The rows are already marked seen, so every subscriber gets its own
+        # attempt; one failure must not cost the others this match
+        found = (
+            f"🌠 Your wish `{wish['query']}` has {len(new_rows)} new result(s), e.g. "
+            f"`{best.get('display_name')}` from {best['username']}. "
+            "Use `!wish` and `!wish show <number>` to see them."
+        )
+        watchers = [sub for sub in wish["subscribers"] if not sub.get("auto")]
+        if watchers:
+            await self._notify_subscribers(watchers, found)
+        for sub in [sub for sub in wish["subscribers"] if sub.get("auto")]:
+            # Same path as `!dl`, so dedup, queue limits and notices all apply
+            ctx = WishContext(self.bot, sub["user_id"], sub["channel_id"])
+            try:
+                await ctx.send(f"🌠 Found your wish `{wish['query']}`; downloading the best match.")
+            except Exception as e:
+                logger.warning(f"Could not announce wish '{wish['query']}': {e}")
+            try:
+                if best["type"] == "folder":
+                    queued = await self._queue_folder(ctx, best)
+                else:
+                    queued = await self._queue_single_file(ctx, best)
+            except Exception as e:
+                logger.error(f"Auto-download for wish '{wish['query']}' failed: {e}")
+                queued = False
+            if queued:
+                self.wishlist.remove(key, sub["user_id"])
+            else:
+                # Keep the wish so the match can still be fetched by hand
+                await self._notify_subscribers([sub], found)
+
+    @tasks.loop(seconds=WISHLIST_INTERVAL_SECONDS)
+    async def wishlist_scheduler(self):
+        """Re-searches a few due wishes per tick so searches stay spread out."""
+        await self.bot.wait_until_ready()
+        if not self.wishlist.wishes or self.api.unavailable:
+            return
+        try:
+            for key in self.wishlist.due(WISHLIST_BATCH):
+                try:
+                    await self._run_wish(key)
+                except Exception as e:
+                    logger.error(f"Wish '{key}' failed: {e}")
+            if self.wishlist.dirty:
+                await self._save_wishlist()
+        except Exception as e:
+            logger.error(f"Error in wishlist_scheduler task: {e}")
+
 
 # --- Bot Run ---
+async def sync_app_commands():
+    """Registers the hybrid commands as slash commands with Discord."""
+    try:
+        if DISCORD_GUILD_ID:
+            guild = discord.Object(id=int(DISCORD_GUILD_ID))
+            bot.tree.copy_global_to(guild=guild)
+            synced = await bot.tree.sync(guild=guild)
+        else:
+            synced = await bot.tree.sync()
+        logger.info(f"Synced {len(synced)} slash commands.")
+    except (discord.HTTPException, ValueError) as e:
+        logger.error(f"Failed to sync slash commands: {e}")
+
+
 @bot.event
 async def on_ready():
-    global cog_instance
+    global cog_instance, app_commands_synced
     logger.info(f"Logged in as {bot.user.name} (ID: {bot.user.id})")
     logger.info("Connecting to slskd API...")
     try:
@@ -928,6 +3892,10 @@ async def on_ready():
             if isinstance(existing, SlskdCog):
                 cog_instance = existing
 
+        if not app_commands_synced:
+            await sync_app_commands()
+            app_commands_synced = True
+
         server_state = None
         if cog_instance:
             state = await cog_instance.api.get_application_state()
@@ -949,12 +3917,13 @@ async def on_ready():
 
 
 def main():
-    if not DISCORD_BOT_TOKEN or not SLSKD_API_KEY or not SLSKD_API_URL:
+    if not DISCORD_BOT_TOKEN or not all(url and key for _, url, key in SLSKD_BACKEND_CONFIGS):
         print("---")
         print("ERROR: Missing one or more environment variables:")
         print(" - DISCORD_BOT_TOKEN (Your bot's token)")
         print(" - SLSKD_API_KEY (Your slskd API key)")
         print(" - SLSKD_API_URL (e.g., http://localhost:5030)")
+        print(" - or SLSKD_<NAME>_API_URL / SLSKD_<NAME>_API_KEY for each SLSKD_BACKENDS name")
         print("---")
         return
 